@@ -0,0 +1,135 @@
+"""Inverted-file (IVF) approximate nearest neighbour index in pure NumPy.
+
+Vectors are expected to be L2-normalized, so inner product equals cosine similarity.
+They are clustered with spherical k-means and stored contiguously, grouped by their
+nearest centroid; a query only scans the `nprobe` lists whose centroids are closest to
+it. An index can be saved as plain ``.npy`` files and loaded back memory-mapped.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+
+import numpy as np
+
+_ASSIGN_CHUNK = 8192
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by inner product) of every vector, computed in chunks."""
+
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = vectors[start:start + _ASSIGN_CHUNK]
+        assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+class IVFIndex:
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        offsets: np.ndarray,
+        nprobe: int = 8,
+    ) -> None:
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        n_lists: int | None = None,
+        *,
+        nprobe: int = 8,
+        iterations: int = 10,
+        sample_size: int | None = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        count = len(vectors)
+        n_lists = max(1, min(count, n_lists or int(math.sqrt(count))))
+        rng = np.random.default_rng(seed)
+
+        # k-means on a sample is enough to place the centroids.
+        sample_size = min(count, sample_size or n_lists * 64)
+        sample = vectors[rng.choice(count, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = _assign(sample, centroids)
+            counts = np.bincount(assignment, minlength=n_lists)
+            order = np.argsort(assignment, kind="stable")
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            filled = counts > 0
+            sums = np.zeros_like(centroids)
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            # Re-seed empty lists with random sample points.
+            sums[~filled] = sample[rng.choice(sample_size, int((~filled).sum()))]
+            centroids = _normalize(sums).astype(np.float32)
+
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+        return cls(centroids, vectors[order], order.astype(np.int64), offsets, nprobe)
+
+    def search(self, query: np.ndarray, k: int, nprobe: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Ids and scores of (approximately) the `k` nearest vectors, best first."""
+
+        query = np.asarray(query, dtype=np.float32)
+        nprobe = min(self.n_lists, nprobe or self.nprobe)
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        slices = [(self.offsets[c], self.offsets[c + 1]) for c in probe if self.offsets[c + 1] > self.offsets[c]]
+        if not slices or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows = np.concatenate([np.arange(start, stop) for start, stop in slices])
+        scores = np.concatenate([self.vectors[start:stop] @ query for start, stop in slices])
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return self.ids[rows[top]], scores[top]
+
+    def save(self, path: str) -> None:
+        """Write the index to directory `path` as ``.npy`` files plus a small JSON header."""
+
+        os.makedirs(path, exist_ok=True)
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "ivf.json"), "w") as handle:
+            json.dump({"nprobe": self.nprobe, "n_lists": self.n_lists, "size": len(self)}, handle)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """Load an index written by `save`; vectors stay on disk when `mmap` is set."""
+
+        with open(os.path.join(path, "ivf.json")) as handle:
+            header = json.load(handle)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode if name == "vectors" else None)
+            for name in ("centroids", "vectors", "ids", "offsets")
+        }
+        return cls(nprobe=header["nprobe"], **arrays)
@@ -0,0 +1,136 @@
+"""Okapi BM25 retrieval over an inverted index.
+
+Each posting stores its precomputed BM25 term weight, so a query only touches the
+postings of its own terms: scores are accumulated with one `bincount` over those
+postings and never over the whole corpus.
+
+An index that is one shard of a larger corpus can instead be scored with the corpus'
+`BM25Stats` (document count, total length and document frequencies), so scores from
+different shards are comparable; the weights of the query's postings are then
+computed per query.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BM25Stats:
+    """Corpus statistics BM25 weights depend on, summed over the shards of a corpus."""
+
+    size: int = 0
+    total_length: float = 0.0
+    doc_freq: Counter = field(default_factory=Counter)
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.size if self.size and self.total_length else 1.0
+
+    @classmethod
+    def of(cls, indexes: Iterable[BM25Index]) -> BM25Stats:
+        return cls().replace((), indexes)
+
+    def replace(self, removed: Iterable[BM25Index], added: Iterable[BM25Index]) -> BM25Stats:
+        """Statistics with the `removed` shards taken out and the `added` ones put in."""
+
+        size, total_length, doc_freq = self.size, self.total_length, Counter(self.doc_freq)
+        for index in removed:
+            size -= index.size
+            total_length -= index.total_length
+            doc_freq.subtract(index.doc_freq)
+        for index in added:
+            size += index.size
+            total_length += index.total_length
+            doc_freq.update(index.doc_freq)
+        return BM25Stats(size, total_length, +doc_freq)
+
+
+class BM25Index:
+    def __init__(self, documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        self.lengths = np.array([len(terms) for terms in documents], dtype=np.float64)
+        self.total_length = float(self.lengths.sum())
+        avg_length = float(self.lengths.mean()) if self.size and self.lengths.any() else 1.0
+
+        collected: dict[str, tuple[list[int], list[int]]] = {}
+        for doc_id, terms in enumerate(documents):
+            for term, tf in Counter(terms).items():
+                ids, tfs = collected.setdefault(term, ([], []))
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        # term -> (document ids, BM25 weight of the term in each of those documents)
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # term -> term frequency in each of those documents, for scoring with corpus stats
+        self.frequencies: dict[str, np.ndarray] = {}
+        self.doc_freq: dict[str, int] = {}
+        for term, (ids, tfs) in collected.items():
+            doc_ids = np.asarray(ids, dtype=np.int64)
+            tf = np.asarray(tfs, dtype=np.float64)
+            self.frequencies[term] = tf
+            self.doc_freq[term] = len(ids)
+            self.postings[term] = (doc_ids, self._weights(tf, doc_ids, self.size, len(ids), avg_length))
+
+    def _weights(self, tf: np.ndarray, doc_ids: np.ndarray, size: int, doc_freq: int, avg_length: float) -> np.ndarray:
+        idf = math.log(1.0 + (size - doc_freq + 0.5) / (doc_freq + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * self.lengths[doc_ids] / avg_length)
+        return idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+    def _postings(self, terms: Iterable[str], stats: BM25Stats | None) -> list[tuple[np.ndarray, np.ndarray]]:
+        terms = [term for term in set(terms) if term in self.postings]
+        if stats is None:
+            return [self.postings[term] for term in terms]
+        avg_length = stats.avg_length
+        return [
+            (
+                self.postings[term][0],
+                self._weights(
+                    self.frequencies[term],
+                    self.postings[term][0],
+                    stats.size,
+                    stats.doc_freq.get(term, self.doc_freq[term]),
+                    avg_length,
+                ),
+            )
+            for term in terms
+        ]
+
+    def search(self, terms: Iterable[str], k: int, stats: BM25Stats | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Ids and scores of the `k` best documents containing any of `terms`, best first.
+
+        Scores use this index's own statistics, or the corpus-wide `stats` if given.
+        """
+
+        hits = self._postings(terms, stats)
+        if not hits or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        doc_ids, inverse = np.unique(np.concatenate([ids for ids, _ in hits]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([weights for _, weights in hits]))
+        if len(scores) > k:
+            # Keep every document tied with the k-th score, so ties go to the lower id.
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            top = np.flatnonzero(scores >= kth)
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((doc_ids[top], -scores[top]))][:k]
+        return doc_ids[top], scores[top]
+
+    def score_documents(self, terms: Iterable[str], doc_ids: np.ndarray, stats: BM25Stats | None = None) -> np.ndarray:
+        """BM25 scores of the given documents (0 where no term matches)."""
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        scores = np.zeros(len(doc_ids))
+        for ids, weights in self._postings(terms, stats):
+            positions = np.minimum(np.searchsorted(ids, doc_ids), len(ids) - 1)
+            hit = ids[positions] == doc_ids
+            scores[hit] += weights[positions[hit]]
+        return scores
@@ -0,0 +1,69 @@
+"""Inverted index over a :class:`ProfileMatrix` for networking candidate generation.
+
+Most attendee pairs share no interests, skills or goals, so their score can only come
+from industry, role and location. Postings from normalized tag to rows (plus industry,
+location and region buckets) let the recommender fully score only the rows that share
+something with the subject, and skip the rest when their best possible score cannot
+reach the current k-th best.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .similarity import WEIGHTS
+from .vectorized import TAG_FIELDS, EncodedProfile, ProfileMatrix
+
+# Best possible score of a row that shares no tag with the subject.
+CONTEXT_BOUND = round(WEIGHTS["industry"] + WEIGHTS["role"] + WEIGHTS["location"], 3)
+# ... and of a row that also shares no industry, location or region.
+ROLE_BOUND = round(WEIGHTS["role"], 3)
+
+
+class _Postings:
+    """Rows grouped by a non-negative integer key, in CSR form."""
+
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, key_count: int) -> None:
+        order = np.argsort(keys, kind="stable")
+        self.rows = rows[order].astype(np.int64)
+        self.indptr = np.zeros(key_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=key_count), out=self.indptr[1:])
+
+    def lookup(self, keys) -> list[np.ndarray]:
+        return [self.rows[self.indptr[key]:self.indptr[key + 1]] for key in keys if 0 <= key < len(self.indptr) - 1]
+
+
+class CandidateIndex:
+    def __init__(self, matrix: ProfileMatrix) -> None:
+        self.matrix = matrix
+        count = len(matrix)
+        row_ids = np.arange(count)
+
+        self._tags: dict[str, _Postings] = {}
+        for field in TAG_FIELDS:
+            rows = np.repeat(row_ids, np.diff(matrix.tag_indptr[field]))
+            self._tags[field] = _Postings(matrix.tag_indices[field], rows, len(matrix.vocab[field]))
+
+        # Industry, location and region buckets, in that order.
+        self._context: list[_Postings] = []
+        for codes in (matrix.industry, matrix.location, matrix.region):
+            present = codes != 0
+            keys = codes[present].astype(np.int64)
+            self._context.append(_Postings(keys, row_ids[present], int(codes.max(initial=0)) + 1))
+
+    def tag_candidates(self, subject: EncodedProfile) -> np.ndarray:
+        """Rows sharing at least one interest, skill or goal with the subject."""
+
+        postings: list[np.ndarray] = []
+        for field in TAG_FIELDS:
+            postings.extend(self._tags[field].lookup(subject.tag_ids[field].tolist()))
+        return np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int64)
+
+    def context_candidates(self, subject: EncodedProfile) -> np.ndarray:
+        """Rows sharing the subject's industry, location or region."""
+
+        postings: list[np.ndarray] = []
+        for bucket, key in zip(self._context, (subject.industry, subject.location, subject.region)):
+            if key > 0:
+                postings.extend(bucket.lookup([key]))
+        return np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int64)
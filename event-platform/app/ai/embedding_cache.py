@@ -0,0 +1,103 @@
+"""Content-addressed LRU cache of text embeddings.
+
+Vectors are keyed by a hash of the text that was encoded, so unchanged documents are
+never re-encoded no matter which snapshot they come from. The cache can optionally be
+persisted to an ``.npz`` file and reloaded on startup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 10_000, path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Held across a whole save, so an older snapshot never replaces a newer one.
+        self._save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str) -> np.ndarray | None:
+        key = text_key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        key = text_key(text)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+    def save(self) -> None:
+        """Write the cache to `path` (atomically) if it changed since the last save."""
+
+        if not self.path or not self._dirty:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                keys = list(self._entries)
+                vectors = np.stack(list(self._entries.values())) if keys else np.empty((0, 0), dtype=np.float32)
+                self._dirty = False
+            # A temporary file of its own, so saves from other processes sharing `path` don't clash.
+            directory = os.path.dirname(os.path.abspath(self.path))
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as handle:
+                tmp_path = handle.name
+                try:
+                    np.savez(handle, keys=np.asarray(keys), vectors=vectors)
+                except BaseException:
+                    handle.close()
+                    os.unlink(tmp_path)
+                    self._dirty = True
+                    raise
+            os.replace(tmp_path, self.path)
+
+    def load(self) -> None:
+        try:
+            with np.load(self.path) as data:
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+        except (OSError, KeyError, ValueError) as exc:
+            print(f"Warning: could not load embedding cache {self.path}: {exc}")
+            return
+        with self._lock:
+            for key, vector in zip(keys[-self.max_entries:], vectors[-self.max_entries:]):
+                self._entries[key] = vector
@@ -0,0 +1,87 @@
+"""Micro-batching front end for a text embedding model.
+
+Concurrent ``await encoder.encode(texts)`` calls are queued for at most `max_wait_ms`
+(or until `max_batch` texts are waiting) and then sent to the model as one batch on a
+dedicated worker thread, so inference never runs on the event loop and many small chat
+requests share one forward pass.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+_Pending = list[tuple[list[str], asyncio.Future]]
+
+
+class BatchingEncoder:
+    def __init__(
+        self,
+        encode_batch: Callable[[list[str]], np.ndarray],
+        *,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.texts = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-encoder")
+        self._pending: _Pending = []
+        self._pending_texts = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings of `texts` as an ``(n, d)`` array, computed in a shared batch."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def stats(self) -> dict[str, int]:
+        return {"batches": self.batches, "texts": self.texts, "max_batch": self.max_batch}
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_texts = self._pending, [], 0
+        if not pending:
+            return
+        texts = [text for request, _ in pending for text in request]
+        self.batches += 1
+        self.texts += len(texts)
+        work = asyncio.get_running_loop().run_in_executor(self._executor, self._run, texts)
+        work.add_done_callback(partial(self._deliver, pending))
+
+    def _run(self, texts: list[str]) -> np.ndarray:
+        # The same question often arrives from several clients at once.
+        unique = list(dict.fromkeys(texts))
+        vectors = self.encode_batch(unique)
+        positions = {text: row for row, text in enumerate(unique)}
+        return vectors[[positions[text] for text in texts]]
+
+    @staticmethod
+    def _deliver(pending: _Pending, work: asyncio.Future) -> None:
+        error = work.exception()
+        vectors = None if error else work.result()
+        start = 0
+        for request, future in pending:
+            stop = start + len(request)
+            if not future.done():
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(vectors[start:stop])
+            start = stop
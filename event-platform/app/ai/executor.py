@@ -0,0 +1,143 @@
+"""Runs CPU-bound AI work away from the asyncio event loop.
+
+Each named task runs in one of three modes:
+
+- ``"inline"``: on the event loop, as before;
+- ``"thread"``: on a shared thread pool. Suited to NumPy / model code, which releases
+  the GIL, and to work on shared in-memory indexes;
+- ``"process"``: on a process pool. Suited to pure-Python scoring; the function and
+  its arguments must be picklable, so tasks that use the API process's in-memory
+  indexes cannot use it.
+
+Every task records how long it waited for a worker and how long it ran; each pool
+reports how many tasks are in flight and how many of those are still queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+# Tasks that read shared in-memory state and therefore cannot run in another process.
+THREAD_ONLY_TASKS = frozenset({"networking_event", "rag_chat", "rag_index"})
+
+
+def _timed(fn: Callable[..., Any], args: tuple, kwargs: dict) -> tuple[Any, float, float]:
+    # Wall-clock time, so stamps taken in a worker process compare with the caller's.
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time()
+
+
+@dataclass
+class TaskStats:
+    calls: int = 0
+    errors: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record(self, wait: float, run: float) -> None:
+        self.calls += 1
+        self.wait_seconds += wait
+        self.run_seconds += run
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def as_dict(self) -> dict[str, float]:
+        calls = max(self.calls, 1)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_wait_ms": round(1000 * self.wait_seconds / calls, 3),
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+            "avg_run_ms": round(1000 * self.run_seconds / calls, 3),
+        }
+
+
+class AiExecutor:
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int | None = None,
+        modes: Mapping[str, str] | None = None,
+        default_mode: str = "thread",
+    ) -> None:
+        modes = dict(modes or {})
+        for task, mode in {**modes, "*": default_mode}.items():
+            if mode not in EXECUTOR_MODES:
+                raise ValueError(f"Unknown executor mode {mode!r} for {task}; expected one of {', '.join(EXECUTOR_MODES)}")
+            if mode == "process" and task in THREAD_ONLY_TASKS:
+                raise ValueError(f"AI task {task} uses in-memory indexes and cannot run in a process pool")
+        self.modes = modes
+        self.default_mode = default_mode
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._pools: dict[str, Executor] = {}
+        self._in_flight = {"thread": 0, "process": 0}
+        self._stats: dict[str, TaskStats] = {}
+
+    def mode(self, task: str) -> str:
+        return self.modes.get(task, self.default_mode)
+
+    def _pool(self, mode: str) -> Executor:
+        pool = self._pools.get(mode)
+        if pool is None:
+            if mode == "process":
+                pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="ai-worker")
+            self._pools[mode] = pool
+        return pool
+
+    async def run(self, task: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the mode configured for `task`."""
+
+        stats = self._stats.setdefault(task, TaskStats())
+        mode = self.mode(task)
+        submitted = time.time()
+        if mode == "inline":
+            try:
+                result, started, finished = _timed(fn, args, kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            stats.record(started - submitted, finished - started)
+            return result
+
+        loop = asyncio.get_running_loop()
+        self._in_flight[mode] += 1
+        try:
+            result, started, finished = await loop.run_in_executor(self._pool(mode), partial(_timed, fn, args, kwargs))
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            self._in_flight[mode] -= 1
+        stats.record(max(0.0, started - submitted), finished - started)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        pools = {}
+        for mode, workers in (("thread", self.thread_workers), ("process", self.process_workers)):
+            pool = self._pools.get(mode)
+            if pool is None:
+                continue
+            workers = workers or pool._max_workers  # type: ignore[attr-defined]
+            in_flight = self._in_flight[mode]
+            pools[mode] = {"workers": workers, "in_flight": in_flight, "queue_depth": max(0, in_flight - workers)}
+        return {
+            "modes": {task: self.mode(task) for task in sorted(set(self.modes) | set(self._stats))},
+            "pools": pools,
+            "tasks": {task: stats.as_dict() for task, stats in sorted(self._stats.items())},
+        }
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
@@ -0,0 +1,44 @@
+"""Blocked all-pairs top-k matching over a :class:`ProfileMatrix`.
+
+The functions here run inside worker processes: the matrix is shipped once per worker
+through `init_worker`, after which each task only carries the row range of a block.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .networking import _top_k
+from .vectorized import ProfileMatrix
+
+_worker_matrix: ProfileMatrix | None = None
+
+
+def init_worker(matrix: ProfileMatrix) -> None:
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def top_k_block(matrix: ProfileMatrix, rows: np.ndarray, k: int) -> tuple[list[list[int]], list[list[float]]]:
+    """Best `k` other rows (and their scores) for each row in `rows`, ordered like `recommend_connections`."""
+
+    scores = matrix.score_block(rows)
+    eligible = np.ones_like(scores, dtype=bool)
+    eligible[np.arange(len(rows)), rows] = False
+
+    top_rows: list[list[int]] = []
+    top_scores: list[list[float]] = []
+    for i in range(len(rows)):
+        best = _top_k(scores[i], eligible[i], k)
+        top_rows.append(best.tolist())
+        top_scores.append(scores[i, best].tolist())
+    return top_rows, top_scores
+
+
+def score_block(block: int, start: int, stop: int, k: int) -> tuple[int, list[list[int]], list[list[float]]]:
+    """Worker entry point: top-k for rows ``start:stop`` of the matrix given to `init_worker`."""
+
+    if _worker_matrix is None:
+        raise RuntimeError("Worker matrix is not initialized")
+    top_rows, top_scores = top_k_block(_worker_matrix, np.arange(start, stop), k)
+    return block, top_rows, top_scores
@@ -3,8 +3,17 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
+from functools import lru_cache
 
-from .similarity import similarity
+import numpy as np
+
+from .candidate_index import CONTEXT_BOUND, ROLE_BOUND, CandidateIndex
+from .vectorized import ProfileMatrix
+
+# With diversity re-ranking, MMR picks `limit` matches from the best `limit * factor`.
+MMR_POOL_FACTOR = 5
+# Distinct overlap patterns whose reason text is kept.
+TEXT_CACHE_SIZE = 4096
 
 
 def recommend_connections(
@@ -13,31 +22,195 @@ def recommend_connections(
     *,
     limit: int = 3,
     min_score: float = 0.0,
+    diversity: float = 0.0,
+    explain: bool = True,
+) -> list[dict]:
+    """Suggest the strongest attendee matches along with human-readable reasons.
+
+    Scoring runs in two phases: every candidate is scored in one vectorized pass and
+    only the top `limit` survivors get their overlap and reason text built (skipped
+    entirely when `explain` is false). A non-zero `diversity` re-ranks the best
+    candidates with `rerank_diverse` first.
+    """
+
+    if not attendees:
+        return []
+
+    matrix = ProfileMatrix(attendees)
+    return recommend_from_matrix(
+        matrix,
+        subject,
+        limit=limit,
+        min_score=min_score,
+        exclude=_exclusion_mask(subject, matrix.profiles),
+        diversity=diversity,
+        explain=explain,
+    )
+
+
+def recommend_from_matrix(
+    matrix: ProfileMatrix,
+    subject: dict,
+    *,
+    limit: int = 3,
+    min_score: float = 0.0,
+    exclude: np.ndarray | None = None,
+    index: CandidateIndex | None = None,
+    diversity: float = 0.0,
+    explain: bool = True,
 ) -> list[dict]:
-    """Suggest the strongest attendee matches along with human-readable reasons."""
-
-    matches: list[dict] = []
-    for candidate in attendees:
-        if candidate is subject or candidate.get("id") == subject.get("id"):
-            continue
-
-        score = similarity(subject, candidate)
-        if score < min_score:
-            continue
-
-        overlap = _collect_overlap(subject, candidate)
-        reason = _reason_from_overlap(subject, candidate, overlap, score)
-        matches.append(
-            {
-                "match": candidate,
-                "score": score,
-                "reason": reason,
-                "overlap": overlap,
-            }
+    """`recommend_connections` over profiles that are already encoded."""
+
+    rows, scores = rank_candidates(
+        matrix,
+        subject,
+        limit=candidate_pool(limit, diversity),
+        min_score=min_score,
+        exclude=exclude,
+        index=index,
+    )
+    if diversity > 0:
+        rows, scores = rerank_diverse(matrix, rows, scores, limit, diversity)
+    return [build_match(subject, matrix.profiles[row], score, explain=explain) for row, score in zip(rows, scores)]
+
+
+def rank_candidates(
+    matrix: ProfileMatrix,
+    subject: dict,
+    *,
+    limit: int,
+    min_score: float = 0.0,
+    exclude: np.ndarray | None = None,
+    index: CandidateIndex | None = None,
+) -> tuple[list[int], list[float]]:
+    """Rows and scores of the best `limit` candidates in `matrix`, best first.
+
+    With an `index`, candidates are scored in tiers of decreasing best-possible score
+    (shared tags, then shared industry/location/region, then everyone else) and a tier
+    is skipped once its bound falls below `min_score` or the current k-th best score.
+    """
+
+    if index is None:
+        scores = matrix.score(subject)
+        eligible = scores >= min_score
+        if exclude is not None:
+            eligible &= ~exclude
+        rows = _top_k(scores, eligible, limit)
+        return rows.tolist(), scores[rows].tolist()
+
+    encoded = matrix.encode(subject)
+    best_rows = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0)
+    seen = np.zeros(len(matrix), dtype=bool)
+    tiers = (
+        (index.tag_candidates(encoded), np.inf),
+        (index.context_candidates(encoded), matrix.upper_bound(CONTEXT_BOUND)),
+        (None, matrix.upper_bound(ROLE_BOUND)),
+    )
+    for rows, bound in tiers:
+        if bound < min_score or (len(best_rows) >= limit and bound < best_scores[limit - 1]):
+            break
+        rows = np.flatnonzero(~seen) if rows is None else rows[~seen[rows]]
+        seen[rows] = True
+        if exclude is not None:
+            rows = rows[~exclude[rows]]
+        scores = matrix.score(encoded, rows)
+        keep = scores >= min_score
+        best_rows, best_scores = _select_top(
+            np.concatenate([best_rows, rows[keep]]),
+            np.concatenate([best_scores, scores[keep]]),
+            limit,
         )
+    return best_rows.tolist(), best_scores.tolist()
+
 
-    matches.sort(key=lambda entry: entry["score"], reverse=True)
-    return matches[:limit]
+def candidate_pool(limit: int, diversity: float) -> int:
+    """How many top-scored candidates to rank before picking `limit` of them."""
+
+    return limit * MMR_POOL_FACTOR if diversity > 0 else limit
+
+
+def rerank_diverse(
+    matrix: ProfileMatrix,
+    rows: Sequence[int],
+    scores: Sequence[float],
+    limit: int,
+    diversity: float,
+) -> tuple[list[int], list[float]]:
+    """Pick `limit` of the candidate `rows` by maximal marginal relevance.
+
+    `rows` are ordered best first by `scores`. Each pick maximizes
+    ``(1 - diversity) * score - diversity * redundancy``, where redundancy is the
+    candidate's highest similarity to anyone already picked, or 1.0 if they work at
+    the same company. Similarities between candidates come from one small
+    `score_block` on the encoded profiles. Scores are returned unchanged.
+    """
+
+    rows = list(rows)
+    scores = list(scores)
+    if len(rows) <= 1 or limit <= 1:
+        return rows[:limit], scores[:limit]
+
+    candidates = np.asarray(rows, dtype=np.int64)
+    companies = [(matrix.profiles[row].get("company") or "").strip().lower() for row in rows]
+    _, company_codes = np.unique(companies, return_inverse=True)
+    has_company = np.array([bool(company) for company in companies])
+    same_company = (company_codes[:, None] == company_codes[None, :]) & has_company[:, None]
+    redundancy = np.maximum(matrix.score_block(candidates, candidates), same_company)
+
+    relevance = (1.0 - diversity) * np.asarray(scores)
+    picked = [0]
+    closest = redundancy[0].copy()
+    available = np.ones(len(rows), dtype=bool)
+    available[0] = False
+    while len(picked) < min(limit, len(rows)):
+        marginal = np.where(available, relevance - diversity * closest, -np.inf)
+        best = int(np.argmax(marginal))  # ties go to the higher-scored candidate
+        picked.append(best)
+        available[best] = False
+        closest = np.maximum(closest, redundancy[best])
+    return [rows[i] for i in picked], [scores[i] for i in picked]
+
+
+def _top_k(scores: np.ndarray, eligible: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the `limit` best eligible scores; ties keep input order like a stable sort."""
+
+    candidates = np.flatnonzero(eligible)
+    return _select_top(candidates, scores[candidates], limit)[0]
+
+
+def _select_top(rows: np.ndarray, scores: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+    """The `limit` best ``(row, score)`` pairs, best first, ties broken by row."""
+
+    if limit <= 0 or not len(rows):
+        return rows[:0], scores[:0]
+    if len(rows) > limit:
+        kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        keep = scores >= kth
+        rows, scores = rows[keep], scores[keep]
+    order = np.lexsort((rows, -scores))[:limit]
+    return rows[order], scores[order]
+
+
+def _exclusion_mask(subject: dict, attendees: Sequence[dict]) -> np.ndarray:
+    subject_id = subject.get("id")
+    return np.fromiter(
+        (candidate is subject or candidate.get("id") == subject_id for candidate in attendees),
+        dtype=bool,
+        count=len(attendees),
+    )
+
+
+def build_match(subject: dict, candidate: dict, score: float, explain: bool = True) -> dict:
+    if not explain:
+        return {"match": candidate, "score": score}
+    overlap = _collect_overlap(subject, candidate)
+    return {
+        "match": candidate,
+        "score": score,
+        "reason": _reason_from_overlap(subject, candidate, overlap, score),
+        "overlap": overlap,
+    }
 
 
 def _collect_overlap(subject: dict, candidate: dict) -> dict[str, list[str]]:
@@ -50,6 +223,11 @@ def _collect_overlap(subject: dict, candidate: dict) -> dict[str, list[str]]:
 
 
 def _format_list(values: Sequence[str]) -> str:
+    return _format_tuple(tuple(values))
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _format_tuple(values: tuple[str, ...]) -> str:
     cleaned = [value for value in values if value]
     if not cleaned:
         return ""
@@ -59,25 +237,47 @@ def _format_list(values: Sequence[str]) -> str:
 
 
 def _reason_from_overlap(subject: dict, candidate: dict, overlap: dict[str, list[str]], score: float) -> str:
+    industry = subject.get("industry")
+    location = subject.get("location")
+    details = _reason_details(
+        tuple(overlap["skills"]),
+        tuple(overlap["interests"]),
+        tuple(overlap["goals"]),
+        industry if industry and industry == candidate.get("industry") else None,
+        location if location and location == candidate.get("location") else None,
+        candidate.get("role"),
+    )
+    return f"{candidate.get('name', 'This attendee')}{details}. Match score {score:.2f}."
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _reason_details(
+    skills: tuple[str, ...],
+    interests: tuple[str, ...],
+    goals: tuple[str, ...],
+    industry: str | None,
+    location: str | None,
+    role: str | None,
+) -> str:
+    """Everything in a reason but the name and score; the same patterns recur across many pairs."""
+
     fragments: list[str] = []
-    if overlap["skills"]:
-        fragments.append(f"shared hands-on skills in {_format_list(overlap['skills'])}")
-    if overlap["interests"]:
-        fragments.append(f"both curious about {_format_list(overlap['interests'])}")
-    if overlap["goals"]:
-        fragments.append(f"aligned goals around {_format_list(overlap['goals'])}")
-    if subject.get("industry") and subject.get("industry") == candidate.get("industry"):
-        fragments.append(f"operating in {subject['industry']}")
-    if subject.get("location") and subject.get("location") == candidate.get("location"):
-        fragments.append(f"already nearby in {subject['location']}")
+    if skills:
+        fragments.append(f"shared hands-on skills in {_format_tuple(skills)}")
+    if interests:
+        fragments.append(f"both curious about {_format_tuple(interests)}")
+    if goals:
+        fragments.append(f"aligned goals around {_format_tuple(goals)}")
+    if industry:
+        fragments.append(f"operating in {industry}")
+    if location:
+        fragments.append(f"already nearby in {location}")
 
     if not fragments:
         fragments.append("complementary strengths even without direct overlap")
 
-    candidate_blurb = candidate.get("name", "This attendee")
-    role = candidate.get("role")
     role_note = f" ({role})" if role else ""
-    return f"{candidate_blurb}{role_note}: {'; '.join(fragments)}. Match score {score:.2f}."
+    return f"{role_note}: {'; '.join(fragments)}"
 
 
 def conversation_starter(subject: dict, candidate: dict, overlap: dict[str, list[str]]) -> str:
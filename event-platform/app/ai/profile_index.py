@@ -0,0 +1,133 @@
+"""In-memory attendee profile index used for server-side networking recommendations."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+from .candidate_index import CandidateIndex
+from .networking import recommend_from_matrix, rerank_diverse
+from .vectorized import ProfileMatrix, profile_text
+
+
+class EventProfileIndex:
+    """Attendee profiles of one event, keyed by attendee id.
+
+    Updates only touch the profile dicts and bump `version`; the encoded
+    :class:`ProfileMatrix` and its :class:`CandidateIndex` are rebuilt lazily the
+    next time they are needed. Reads may run on worker threads: the matrix, candidate
+    index and row map are always swapped together under a lock.
+
+    With a `semantic_weight` and an `embed` function (texts to normalized vectors, or
+    ``None`` while no model is available), the matrix blends embedding similarity of
+    the profiles' `profile_text` into its scores as soon as `embed` can provide it.
+    """
+
+    def __init__(
+        self,
+        event_id: str,
+        profiles: Iterable[dict] = (),
+        embed: Callable[[list[str]], np.ndarray | None] | None = None,
+        semantic_weight: float = 0.0,
+    ) -> None:
+        self.event_id = event_id
+        self.embed = embed
+        self.semantic_weight = semantic_weight
+        self.version = 0
+        self._profiles: dict[str, dict] = {str(profile["id"]): profile for profile in profiles}
+        self._matrix: ProfileMatrix | None = None
+        self._candidates: CandidateIndex | None = None
+        self._rows: dict[str, int] = {}
+        self._matrix_version = -1
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, attendee_id: object) -> bool:
+        return attendee_id in self._profiles
+
+    def get(self, attendee_id: str) -> dict | None:
+        return self._profiles.get(attendee_id)
+
+    def upsert(self, profile: dict) -> None:
+        self._profiles[str(profile["id"])] = profile
+        self.version += 1
+
+    def remove(self, attendee_id: str) -> None:
+        if self._profiles.pop(attendee_id, None) is not None:
+            self.version += 1
+
+    def _current(self) -> tuple[ProfileMatrix, CandidateIndex, dict[str, int]]:
+        with self._lock:
+            if self._matrix is None or self._matrix_version != self.version:
+                version = self.version
+                profiles = dict(self._profiles)
+                self._matrix = ProfileMatrix(list(profiles.values()))
+                self._candidates = CandidateIndex(self._matrix)
+                self._rows = {attendee_id: row for row, attendee_id in enumerate(profiles)}
+                self._matrix_version = version
+            if self.semantic_weight > 0 and self.embed is not None and self._matrix.embeddings is None:
+                vectors = self.embed([profile_text(profile) for profile in self._matrix.profiles])
+                if vectors is not None:
+                    self._matrix = self._matrix.with_embeddings(vectors, self.semantic_weight)
+            return self._matrix, self._candidates, self._rows
+
+    @property
+    def matrix(self) -> ProfileMatrix:
+        return self._current()[0]
+
+    def row(self, attendee_id: str) -> int | None:
+        return self._current()[2].get(attendee_id)
+
+    def recommend(
+        self,
+        attendee_id: str,
+        *,
+        limit: int = 3,
+        min_score: float = 0.0,
+        diversity: float = 0.0,
+        explain: bool = True,
+    ) -> list[dict] | None:
+        """Top matches for an indexed attendee, or ``None`` if the attendee is unknown."""
+
+        matrix, candidates, rows = self._current()
+        row = rows.get(attendee_id)
+        if row is None:
+            return None
+        exclude = np.zeros(len(matrix), dtype=bool)
+        exclude[row] = True
+        return recommend_from_matrix(
+            matrix,
+            matrix.profiles[row],
+            limit=limit,
+            min_score=min_score,
+            exclude=exclude,
+            index=candidates,
+            diversity=diversity,
+            explain=explain,
+        )
+
+    def rerank(
+        self,
+        attendee_ids: list[str],
+        scores: list[float],
+        *,
+        limit: int,
+        diversity: float,
+    ) -> tuple[list[dict], list[float]]:
+        """`rerank_diverse` of already scored matches (best first), as profiles and scores.
+
+        Redundancy is measured on the index's own matrix, so it includes embedding
+        similarity like on-demand recommendations do. Attendees no longer indexed are
+        skipped.
+        """
+
+        matrix, _, rows = self._current()
+        kept = [(rows[attendee_id], score) for attendee_id, score in zip(attendee_ids, scores) if attendee_id in rows]
+        picked, picked_scores = rerank_diverse(
+            matrix, [row for row, _ in kept], [score for _, score in kept], limit, diversity
+        )
+        return [matrix.profiles[row] for row in picked], picked_scores
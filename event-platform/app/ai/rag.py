@@ -4,18 +4,49 @@ This is integrated from the approach in event_ai/ai/chatbot.py, but adapted to:
 - Accept frontend-shaped JSON (types.ts compatible)
 - Avoid hard dependency on SentenceTransformers at runtime
 
-If `sentence_transformers` is installed, we use it. Otherwise we fall back to a simple
-token-overlap similarity.
+If `sentence_transformers` is installed, we use it. Otherwise we fall back to BM25
+over an inverted index (or, if configured, a simple token-overlap similarity). The model
+is loaded in a background thread, and the lexical backend answers until it is ready.
+The async entry points (`abuild_index`, `abuild_sharded`, `aanswer`) send embedding
+work through a micro-batching encoder so inference stays off the event loop.
+
+Documents can also be split into one index per (source, event id) shard, so a query
+filtered to e.g. one event's sessions only scores that shard and one event's shards
+can be rebuilt without touching the others. BM25 scores every shard with corpus-wide
+statistics and results are merged by global rank, so sharding does not change what a
+query retrieves.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Iterable
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+from .ann import IVFIndex
+from .bm25 import BM25Index, BM25Stats
+from .embedding_cache import EmbeddingCache
+from .encoder import BatchingEncoder
+from .executor import AiExecutor
+
+RAG_BACKENDS = ("auto", "bm25", "token-jaccard")
+RAG_SOURCES = ("faq", "event", "attendee", "session")
+# auto: dense when the model is ready, else lexical; hybrid: both, fused by rank.
+RETRIEVAL_MODES = ("auto", "dense", "lexical", "hybrid")
+# Reciprocal-rank fusion constant and minimum depth of each backend's list.
+RRF_K = 60
+HYBRID_DEPTH = 20
+
+
+def _terms(text: str) -> list[str]:
+    return [t.strip(".,!?;:()[]{}\"'`).").lower() for t in text.split() if t.strip()]
 
 
 def _tokenize(text: str) -> set[str]:
-    return {t.strip(".,!?;:()[]{}\"'`).").lower() for t in text.split() if t.strip()}
+    return set(_terms(text))
 
 
 def _jaccard(a: set[str], b: set[str]) -> float:
@@ -24,6 +55,26 @@ def _jaccard(a: set[str], b: set[str]) -> float:
     return len(a & b) / len(a | b)
 
 
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` best scores, best first; ties go to the earlier document."""
+
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        rows = np.flatnonzero(scores >= kth)
+    else:
+        rows = np.arange(len(scores))
+    return rows[np.lexsort((rows, -scores[rows]))][:k]
+
+
+def _no_answer(text: str) -> dict:
+    return {"answer": text, "source": None, "score": 0.0, "metadata": {}, "passages": []}
+
+
 @dataclass
 class RagDocument:
     text: str
@@ -31,27 +82,234 @@ class RagDocument:
     source: str
     metadata: dict[str, Any]
     embedding: Any | None = None
+    # The event the document belongs to; None for platform-wide documents (FAQ, users).
+    event_id: str | None = None
+
+
+@dataclass
+class RagIndex:
+    """Documents with their retrieval structures computed once.
+
+    `embeddings` is an L2-normalized ``(n, d)`` float32 matrix (or ``None`` without
+    sentence-transformers), `tokens` holds each document's token set and `bm25` is
+    the inverted index used by the BM25 backend. Large corpora also get an `ann`
+    index over the embeddings instead of an exact scan.
+    """
+
+    documents: list[RagDocument]
+    embeddings: np.ndarray | None = None
+    tokens: list[frozenset[str]] = field(default_factory=list)
+    bm25: BM25Index | None = None
+    ann: IVFIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+
+ShardKey = tuple[str, Optional[str]]
+
+
+@dataclass
+class ShardedRagIndex:
+    """One `RagIndex` per ``(source, event_id)`` shard.
+
+    `bm25_stats` sums the BM25 statistics of all shards: most shards hold a handful of
+    documents (an event is a one-document shard), so their own IDF and average length
+    say nothing about the corpus. Unfiltered queries would have to visit every shard,
+    so they search `full`, one index over all documents, while it is current.
+
+    Instances are treated as immutable: `replace_event` returns a new index that shares
+    the untouched shards, so readers never see a half-rebuilt event.
+    """
+
+    shards: dict[ShardKey, RagIndex] = field(default_factory=dict)
+    bm25_stats: BM25Stats | None = None
+    full: RagIndex | None = None
+
+    def __post_init__(self) -> None:
+        if self.bm25_stats is None:
+            self.bm25_stats = BM25Stats.of(_bm25_indexes(self.shards.values()))
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+
+    def select(self, sources: Sequence[str] | None = None, event_id: str | None = None) -> list[RagIndex]:
+        """Shards of the given `sources` (all if ``None``) that belong to `event_id` (any if ``None``)."""
+
+        return [
+            shard
+            for (source, shard_event), shard in self.shards.items()
+            if (sources is None or source in sources) and (event_id is None or shard_event == event_id)
+        ]
+
+    def replace_event(self, event_id: str, shards: ShardedRagIndex) -> ShardedRagIndex:
+        """A copy with `event_id`'s shards replaced by those of `event_id` in `shards`.
+
+        The copy has no `full` index: unfiltered queries merge the shards until the next
+        full build.
+        """
+
+        stale = [shard for key, shard in self.shards.items() if key[1] == event_id]
+        fresh = {key: shard for key, shard in shards.shards.items() if key[1] == event_id}
+        stats = self.bm25_stats.replace(_bm25_indexes(stale), _bm25_indexes(fresh.values()))
+        # Replaced shards keep their position, so ties still go to the same document.
+        merged = {}
+        for key, shard in self.shards.items():
+            if key[1] != event_id:
+                merged[key] = shard
+            elif key in fresh:
+                merged[key] = fresh.pop(key)
+        return ShardedRagIndex({**merged, **fresh}, stats)
+
+
+def _bm25_indexes(shards: Iterable[RagIndex]) -> list[BM25Index]:
+    return [shard.bm25 for shard in shards if shard.bm25 is not None]
 
 
 class RagEngine:
-    def __init__(self) -> None:
+    """Retrieval over snapshot documents.
+
+    `backend` is ``"auto"`` (sentence-transformers when installed, BM25 otherwise) or
+    one of the lexical backends ``"bm25"`` / ``"token-jaccard"`` to skip the model.
+    Dense retrieval switches from an exact scan to an IVF index once a corpus has
+    `ann_min_documents` documents. `mode` (one of `RETRIEVAL_MODES`) picks dense,
+    lexical or hybrid retrieval per query; dense and hybrid fall back to lexical while
+    no embeddings are available.
+
+    The model is not loaded on construction: `start_loading()` (called on first use,
+    or at startup) loads it in a background thread. `model_state` moves from
+    ``"idle"`` to ``"loading"`` and then ``"ready"`` or ``"unavailable"``; it is
+    ``"disabled"`` for the lexical-only backends.
+
+    Cache misses are encoded in batches of up to `encode_batch_size`; on the async
+    paths, concurrent requests are also merged for up to `encode_max_wait_ms`, and
+    index building (``"rag_index"``) and ranking (``"rag_chat"``) run on `executor`
+    when one is given.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 10_000,
+        cache_path: str | None = None,
+        backend: str = "auto",
+        ann_min_documents: int = 50_000,
+        ann_nprobe: int = 64,
+        model_name: str = "all-MiniLM-L6-v2",
+        encode_batch_size: int = 64,
+        encode_max_wait_ms: float = 5.0,
+        executor: AiExecutor | None = None,
+        mode: str = "auto",
+    ) -> None:
+        if backend not in RAG_BACKENDS:
+            raise ValueError(f"Unknown RAG backend {backend!r}; expected one of {', '.join(RAG_BACKENDS)}")
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+        self.mode = mode
+        self.cache = EmbeddingCache(cache_size, cache_path)
+        self.ann_min_documents = ann_min_documents
+        self.ann_nprobe = ann_nprobe
+        self._lexical_backend = "token-jaccard" if backend == "token-jaccard" else "bm25"
+        self.model_name = model_name
+        self.model_state = "idle" if backend == "auto" else "disabled"
         self._model = None
-        self._use_st = False
+        self._load_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self.encode_batch_size = encode_batch_size
+        self.encoder = BatchingEncoder(
+            self._encode_batch,
+            max_batch=encode_batch_size,
+            max_wait_ms=encode_max_wait_ms,
+        )
+        self.executor = executor
+
+    @property
+    def _use_st(self) -> bool:
+        return self.model_state == "ready"
+
+    @property
+    def backend(self) -> str:
+        return "sentence-transformers" if self._use_st else self._lexical_backend
+
+    def start_loading(self) -> None:
+        """Start loading the sentence-transformers model in a background thread, once."""
+
+        with self._load_lock:
+            if self.model_state != "idle":
+                return
+            self.model_state = "loading"
+        threading.Thread(target=self._load_model, name="rag-model-loader", daemon=True).start()
+
+    def wait_loaded(self, timeout: float | None = None) -> bool:
+        """Start loading if needed and block until the model is ready; ``False`` if it never will be."""
+
+        self.start_loading()
+        if self.model_state == "disabled":
+            return False
+        self._loaded.wait(timeout)
+        return self._use_st
+
+    def _load_model(self) -> None:
         try:
             from sentence_transformers import SentenceTransformer  # type: ignore
 
-            self._model = SentenceTransformer("all-MiniLM-L6-v2")
-            self._use_st = True
+            self._model = SentenceTransformer(self.model_name)
+            self.model_state = "ready"
         except Exception:
             self._model = None
-            self._use_st = False
+            self.model_state = "unavailable"
+        finally:
+            self._loaded.set()
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        vectors = self._model.encode(texts, batch_size=self.encode_batch_size, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _cached(self, texts: list[str]) -> tuple[list[np.ndarray | None], list[str]]:
+        vectors = [self.cache.get(text) for text in texts]
+        misses = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        return vectors, misses
+
+    def _fill(self, texts: list[str], vectors: list, misses: list[str], encoded) -> list[np.ndarray]:
+        computed = dict(zip(misses, encoded))
+        for text, vector in computed.items():
+            self.cache.put(text, vector)
+        return [vector if vector is not None else computed[text] for text, vector in zip(texts, vectors)]
+
+    def _encode_many(self, texts: list[str]) -> list[np.ndarray]:
+        vectors, misses = self._cached(texts)
+        return self._fill(texts, vectors, misses, self._encode_batch(misses) if misses else [])
+
+    async def _aencode_many(self, texts: list[str]) -> list[np.ndarray]:
+        vectors, misses = self._cached(texts)
+        return self._fill(texts, vectors, misses, await self.encoder.encode(misses) if misses else [])
+
+    async def _offload(self, task: str, fn, *args, **kwargs):
+        if self.executor is None:
+            return fn(*args, **kwargs)
+        return await self.executor.run(task, fn, *args, **kwargs)
+
+    def embed(self, texts: list[str]) -> np.ndarray | None:
+        """L2-normalized embeddings of `texts` (through the cache), or ``None`` until the model is ready."""
+
+        self.start_loading()
+        if not self._use_st or not texts:
+            return None
+        return _normalize(np.stack(self._encode_many(texts)).astype(np.float32))
+
+    async def aembed(self, texts: list[str]) -> np.ndarray | None:
+        """`embed` through the batching encoder."""
+
+        self.start_loading()
+        if not self._use_st or not texts:
+            return None
+        return _normalize(np.stack(await self._aencode_many(texts)).astype(np.float32))
 
     def _encode(self, text: str):
         if not self._use_st:
             return None
-        return self._model.encode(text, convert_to_tensor=True)
+        return self._encode_many([text])[0]
 
-    def build_documents(self, snapshot: dict) -> list[RagDocument]:
+    def build_documents(self, snapshot: dict, embed: bool = True) -> list[RagDocument]:
         docs: list[RagDocument] = []
 
         for faq in snapshot.get("faq", []) or []:
@@ -87,6 +345,7 @@ class RagEngine:
                         "location": loc,
                         "start": start,
                     },
+                    event_id=event.get("id"),
                 )
             )
 
@@ -113,6 +372,7 @@ class RagEngine:
                         "role": role,
                         "interests": attendee.get("interests") or [],
                     },
+                    event_id=attendee.get("eventId") or attendee.get("event_id"),
                 )
             )
 
@@ -141,49 +401,318 @@ class RagEngine:
                         "room": room,
                         "topics": session.get("tags") or session.get("topics") or [],
                     },
+                    event_id=session.get("eventId") or session.get("event_id"),
                 )
             )
 
         # embed if available
-        if self._use_st:
-            for doc in docs:
-                doc.embedding = self._encode(doc.text)
+        if embed and self._use_st:
+            for doc, embedding in zip(docs, self._encode_many([doc.text for doc in docs])):
+                doc.embedding = embedding
+            self.cache.save()
 
         return docs
 
-    def answer(self, query: str, documents: Iterable[RagDocument]) -> dict:
+    def build_index(self, documents: Iterable[RagDocument], embed: bool = True) -> RagIndex:
+        self.start_loading()
+        docs = list(documents)
+        terms = [_terms(doc.text) for doc in docs]
+        index = RagIndex(
+            docs,
+            tokens=[frozenset(doc_terms) for doc_terms in terms],
+            bm25=BM25Index(terms) if self._lexical_backend == "bm25" else None,
+        )
+        if embed:
+            self._embed_index(index)
+        return index
+
+    async def abuild_index(self, snapshot: dict) -> RagIndex:
+        """`build_index(build_documents(snapshot))`, embedding through the batching encoder."""
+
+        index = await self._offload(
+            "rag_index",
+            lambda: self.build_index(self.build_documents(snapshot, embed=False), embed=False),
+        )
+        await self._aembed_index(index)
+        return index
+
+    def build_sharded(self, documents: Iterable[RagDocument], embed: bool = True, full: bool = True) -> ShardedRagIndex:
+        """`documents` grouped into one `RagIndex` per ``(source, event_id)``, plus the `full` index."""
+
+        docs = list(documents)
+        groups: dict[ShardKey, list[RagDocument]] = {}
+        for doc in docs:
+            groups.setdefault((doc.source, doc.event_id), []).append(doc)
+        return ShardedRagIndex(
+            {key: self.build_index(group, embed=embed) for key, group in groups.items()},
+            full=self.build_index(docs, embed=embed) if full else None,
+        )
+
+    async def abuild_sharded(self, snapshot: dict, full: bool = True) -> ShardedRagIndex:
+        """`build_sharded(build_documents(snapshot))`, embedding through the batching encoder."""
+
+        sharded = await self._offload(
+            "rag_index",
+            lambda: self.build_sharded(self.build_documents(snapshot, embed=False), embed=False, full=full),
+        )
+        # The full index first, so the shards find every embedding in the cache.
+        if sharded.full is not None:
+            await self._aembed_index(sharded.full)
+        await asyncio.gather(*(self._aembed_index(shard) for shard in sharded.shards.values()))
+        return sharded
+
+    def _unembedded(self, index: RagIndex) -> list[RagDocument]:
+        if not self._use_st or index.embeddings is not None:
+            return []
+        return [doc for doc in index.documents if doc.embedding is None]
+
+    def _finish_embeddings(self, index: RagIndex, missing: list[RagDocument], vectors: list) -> None:
+        for doc, vector in zip(missing, vectors):
+            doc.embedding = vector
+        if missing:
+            self.cache.save()
+        index.embeddings = _normalize(np.stack([doc.embedding for doc in index.documents]).astype(np.float32))
+        if len(index) >= self.ann_min_documents:
+            index.ann = IVFIndex.build(index.embeddings, nprobe=self.ann_nprobe)
+
+    def _embed_index(self, index: RagIndex) -> None:
+        """Add dense structures to `index` if the model is ready and they are missing."""
+
+        if not self._use_st or index.embeddings is not None or not len(index):
+            return
+        missing = self._unembedded(index)
+        self._finish_embeddings(index, missing, self._encode_many([doc.text for doc in missing]))
+
+    async def _aembed_index(self, index: RagIndex) -> None:
+        if not self._use_st or index.embeddings is not None or not len(index):
+            return
+        missing = self._unembedded(index)
+        vectors = await self._aencode_many([doc.text for doc in missing]) if missing else []
+        await self._offload("rag_index", self._finish_embeddings, index, missing, vectors)
+
+    def answer(
+        self,
+        query: str,
+        documents: RagIndex | ShardedRagIndex | Iterable[RagDocument],
+        top_k: int = 1,
+        mode: str | None = None,
+        sources: Sequence[str] | None = None,
+        event_id: str | None = None,
+    ) -> dict:
+        """Best matching document for `query`, plus the `top_k` best as `passages`.
+
+        `mode` overrides the engine's retrieval mode for this query (see `RETRIEVAL_MODES`).
+        `sources` and `event_id` restrict the search to documents of those sources / that
+        event; only the matching shards are scored.
+        """
+
+        query = query or ""
+        if not query.strip():
+            return _no_answer("Ask me something about the event.")
+
+        mode = self._check_mode(mode)
+        shards, stats = self._shards(documents, sources, event_id)
+        # An index built while the model was still loading gets its embeddings now.
+        for shard in shards:
+            self._embed_index(shard)
+        query_vector = self._encode(query) if self._wants_dense(shards, mode) else None
+        return self._answer(query, shards, top_k, query_vector, mode, stats)
+
+    async def aanswer(
+        self,
+        query: str,
+        documents: RagIndex | ShardedRagIndex | Iterable[RagDocument],
+        top_k: int = 1,
+        mode: str | None = None,
+        sources: Sequence[str] | None = None,
+        event_id: str | None = None,
+    ) -> dict:
+        """`answer` with the index and query embeddings computed by the batching encoder."""
+
         query = query or ""
         if not query.strip():
-            return {"answer": "Ask me something about the event.", "source": None, "score": 0.0, "metadata": {}}
-
-        best_doc: RagDocument | None = None
-        best_score = -1.0
-
-        if self._use_st:
-            from sentence_transformers import util  # type: ignore
-
-            q_emb = self._encode(query)
-            for doc in documents:
-                if doc.embedding is None:
-                    doc.embedding = self._encode(doc.text)
-                score = float(util.cos_sim(q_emb, doc.embedding).item())
-                if score > best_score:
-                    best_score = score
-                    best_doc = doc
+            return _no_answer("Ask me something about the event.")
+
+        mode = self._check_mode(mode)
+        unfiltered = sources is None and event_id is None
+        if isinstance(documents, ShardedRagIndex) or (isinstance(documents, RagIndex) and unfiltered):
+            shards, stats = self._shards(documents, sources, event_id)
         else:
-            q_tokens = _tokenize(query)
-            for doc in documents:
-                score = _jaccard(q_tokens, _tokenize(doc.text))
-                if score > best_score:
-                    best_score = score
-                    best_doc = doc
-
-        if best_doc is None:
-            return {"answer": "Sorry, I don't have information about that.", "source": None, "score": 0.0, "metadata": {}}
-
-        return {
-            "answer": best_doc.answer,
-            "source": best_doc.source,
-            "score": round(float(best_score), 4),
-            "metadata": best_doc.metadata,
-        }
+            shards, stats = await self._offload("rag_index", self._shards, documents, sources, event_id, embed=False)
+        await asyncio.gather(*(self._aembed_index(shard) for shard in shards))
+        query_vector = None
+        if self._wants_dense(shards, mode):
+            query_vector = (await self._aencode_many([query]))[0]
+        return await self._offload("rag_chat", self._answer, query, shards, top_k, query_vector, mode, stats)
+
+    def _shards(
+        self,
+        documents: RagIndex | ShardedRagIndex | Iterable[RagDocument],
+        sources: Sequence[str] | None,
+        event_id: str | None,
+        embed: bool = True,
+    ) -> tuple[list[RagIndex], BM25Stats | None]:
+        """The shards to search and the corpus BM25 statistics to score them with."""
+
+        unfiltered = sources is None and event_id is None
+        if isinstance(documents, ShardedRagIndex):
+            if unfiltered and documents.full is not None:
+                return [documents.full], None
+            return documents.select(sources, event_id), documents.bm25_stats
+        if unfiltered:
+            return [documents if isinstance(documents, RagIndex) else self.build_index(documents, embed=embed)], None
+        docs = documents.documents if isinstance(documents, RagIndex) else documents
+        sharded = self.build_sharded(docs, embed=embed, full=False)
+        return sharded.select(sources, event_id), sharded.bm25_stats
+
+    def _check_mode(self, mode: str | None) -> str:
+        mode = mode or self.mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {', '.join(RETRIEVAL_MODES)}")
+        return mode
+
+    def _wants_dense(self, shards: list[RagIndex], mode: str) -> bool:
+        return mode != "lexical" and self._use_st and any(shard.embeddings is not None for shard in shards)
+
+    def _answer(
+        self,
+        query: str,
+        shards: RagIndex | list[RagIndex],
+        top_k: int,
+        query_vector: np.ndarray | None,
+        mode: str = "auto",
+        stats: BM25Stats | None = None,
+    ) -> dict:
+        """Search each shard for its `top_k` best and keep the `top_k` best overall.
+
+        Dense and token-jaccard scores do not depend on the rest of the corpus and BM25
+        scores use the corpus-wide `stats`, so every shard's scores are on one scale and
+        the merged ranking is the one a single index over the same documents gives.
+        """
+
+        if isinstance(shards, RagIndex):
+            shards = [shards]
+        shards = [shard for shard in shards if len(shard)]
+        top_k = max(1, top_k)
+        if query_vector is not None:
+            query_vector = _normalize(query_vector)
+
+        dense = query_vector is not None and bool(shards) and all(shard.embeddings is not None for shard in shards)
+        if dense and mode == "hybrid":
+            hits = self._hybrid_search(shards, query, query_vector, top_k, stats)
+        else:
+            if dense:
+                name, search = "dense", lambda shard: self._dense_search(shard, query_vector, top_k)
+            else:
+                name, search = self._lexical_backend, lambda shard: self._lexical_search(shard, query, top_k, stats)
+            hits = [(score, shard, row, {name: score}) for score, shard, row in self._merge(shards, search, top_k)]
+        if not hits:
+            return _no_answer("Sorry, I don't have information about that.")
+
+        passages = []
+        for score, shard, row, backend_scores in hits:
+            doc = shards[shard].documents[row]
+            passages.append(
+                {
+                    "answer": doc.answer,
+                    "source": doc.source,
+                    "score": round(float(score), 4),
+                    "scores": {name: round(float(value), 4) for name, value in backend_scores.items()},
+                    "metadata": doc.metadata,
+                }
+            )
+        return {**passages[0], "passages": passages}
+
+    @staticmethod
+    def _merge(shards: list[RagIndex], search, k: int) -> list[tuple[float, int, int]]:
+        """The `k` best ``(score, shard position, row)`` of `search` over all `shards`.
+
+        Ties go to the earlier shard, then the earlier row, like a single index.
+        """
+
+        hits = []
+        for position, shard in enumerate(shards):
+            rows, scores = search(shard)
+            hits.extend(zip(scores.tolist(), [position] * len(rows), rows.tolist()))
+        hits.sort(key=lambda hit: (-hit[0], hit[1], hit[2]))
+        return hits[:k]
+
+    def _dense_search(self, index: RagIndex, query_vector: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if index.ann is not None:
+            return index.ann.search(query_vector, k)
+        scores = index.embeddings @ query_vector
+        rows = _top_k(scores, k)
+        return rows, scores[rows]
+
+    def _lexical_search(
+        self,
+        index: RagIndex,
+        query: str,
+        k: int,
+        stats: BM25Stats | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if index.bm25 is not None:
+            return index.bm25.search(_terms(query), k, stats)
+        q_tokens = _tokenize(query)
+        scores = np.fromiter(
+            (_jaccard(q_tokens, tokens) for tokens in index.tokens),
+            dtype=np.float64,
+            count=len(index),
+        )
+        rows = _top_k(scores, k)
+        return rows, scores[rows]
+
+    def _lexical_scores(
+        self,
+        index: RagIndex,
+        query: str,
+        rows: np.ndarray,
+        stats: BM25Stats | None = None,
+    ) -> np.ndarray:
+        if index.bm25 is not None:
+            return index.bm25.score_documents(_terms(query), rows, stats)
+        q_tokens = _tokenize(query)
+        return np.array([_jaccard(q_tokens, index.tokens[row]) for row in rows.tolist()], dtype=np.float64)
+
+    def _hybrid_search(
+        self,
+        shards: list[RagIndex],
+        query: str,
+        query_vector: np.ndarray,
+        k: int,
+        stats: BM25Stats | None = None,
+    ) -> list[tuple[float, int, int, dict[str, float]]]:
+        """Reciprocal-rank fusion of the dense and lexical top lists.
+
+        Each backend's best ``max(HYBRID_DEPTH, 4 * k)`` documents are taken over all
+        `shards` (ranks are global, not per shard) and a document scores
+        ``sum(1 / (RRF_K + rank))`` over the lists it appears in. The raw dense and
+        lexical scores of every fused document are returned alongside.
+        """
+
+        depth = max(HYBRID_DEPTH, 4 * k)
+        fused: dict[tuple[int, int], float] = {}
+        for ranked in (
+            self._merge(shards, lambda shard: self._dense_search(shard, query_vector, depth), depth),
+            self._merge(shards, lambda shard: self._lexical_search(shard, query, depth, stats), depth),
+        ):
+            for rank, (_, shard, row) in enumerate(ranked, start=1):
+                fused[(shard, row)] = fused.get((shard, row), 0.0) + 1.0 / (RRF_K + rank)
+
+        # Ties go to the earlier document, like the single-backend paths.
+        top = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
+        hits = []
+        for (shard, row), score in top:
+            index, rows = shards[shard], np.array([row], dtype=np.int64)
+            hits.append(
+                (
+                    score,
+                    shard,
+                    row,
+                    {
+                        "dense": float(index.embeddings[row] @ query_vector),
+                        self._lexical_backend: float(self._lexical_scores(index, query, rows, stats)[0]),
+                    },
+                )
+            )
+        return hits
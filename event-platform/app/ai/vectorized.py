@@ -0,0 +1,359 @@
+"""Vectorized batch scoring for the networking similarity model.
+
+Profiles are encoded once into a shared vocabulary: the interests/skills/goals tag
+sets become bit-packed rows (one bit per known tag) and industry, role, role group,
+location and region become integer codes. Scoring one subject against N candidates,
+or a block of subjects against all N, is then a handful of NumPy operations and gives
+the same numbers as :func:`app.ai.similarity.similarity`.
+
+Optionally, a matrix can carry one text embedding per profile (`with_embeddings`);
+the cosine similarity of those is then blended into every score.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from .similarity import (
+    CITY_TO_REGION,
+    COMPLEMENTARY_GROUPS,
+    ROLE_GROUPS,
+    WEIGHTS,
+    _role_group,
+    _to_normalized_set,
+)
+
+TAG_FIELDS = ("interests", "skills", "goals")
+
+# Number of set bits for every byte value, used to popcount packed tag rows.
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# Upper bound (in bytes) for the temporary AND-ed tag tensor built by `score_block`.
+_BLOCK_BUDGET = 32 * 1024 * 1024
+
+_GROUP_CODES = {group: code for code, group in enumerate(ROLE_GROUPS, start=1)}
+_REGION_CODES = {region: code for code, region in enumerate(sorted(set(CITY_TO_REGION.values())), start=1)}
+
+
+def _group_score_table() -> np.ndarray:
+    """Role score by (group code, group code) for two different, non-empty roles."""
+
+    size = len(_GROUP_CODES) + 1
+    table = np.full((size, size), 0.5)
+    table[0, :] = 0.4
+    table[:, 0] = 0.4
+    for group, code in _GROUP_CODES.items():
+        for other, other_code in _GROUP_CODES.items():
+            if code == other_code:
+                table[code, other_code] = 0.65
+            elif frozenset({group, other}) in COMPLEMENTARY_GROUPS:
+                table[code, other_code] = 1.0
+    return table
+
+
+_GROUP_SCORES = _group_score_table()
+
+
+def _round3(values: np.ndarray) -> np.ndarray:
+    """Round like the builtin ``round(x, 3)``, which is exact on near-ties where ``np.round`` is not."""
+
+    rounded = np.round(values, 3)
+    scaled = values * 1000.0
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        flat = rounded.reshape(-1)
+        idx = np.flatnonzero(ties)
+        flat[idx] = [round(value, 3) for value in values.reshape(-1)[idx].tolist()]
+    return rounded
+
+
+def profile_text(profile: dict) -> str:
+    """Interests, skills and goals of a profile as one text, for the embedding model."""
+
+    parts = []
+    for field in TAG_FIELDS:
+        values = [str(value).strip() for value in profile.get(field) or [] if value]
+        if values:
+            parts.append(f"{field}: {', '.join(values)}")
+    return "; ".join(parts)
+
+
+@dataclass
+class EncodedProfile:
+    """A single profile expressed in a matrix's vocabulary."""
+
+    tag_ids: dict[str, np.ndarray]
+    tag_sizes: dict[str, int]
+    industry: int
+    role: int
+    role_group: int
+    location: int
+    region: int
+    embedding: np.ndarray | None = None
+
+
+class ProfileMatrix:
+    """Attendee profiles encoded for batch similarity scoring.
+
+    Codes use ``0`` for "missing"; a subject value that is present but unknown to the
+    vocabulary is encoded as ``-1`` so it never matches any row.
+    """
+
+    def __init__(self, profiles: Sequence[dict]) -> None:
+        self.profiles = list(profiles)
+        count = len(self.profiles)
+
+        self.vocab: dict[str, dict[str, int]] = {field: {} for field in TAG_FIELDS}
+        self._industries: dict[object, int] = {}
+        self._roles: dict[str, int] = {}
+        self._locations: dict[str, int] = {}
+
+        # CSR layout of the known tag ids per row: tag_indices[indptr[i]:indptr[i + 1]].
+        self.tag_indptr: dict[str, np.ndarray] = {}
+        self.tag_indices: dict[str, np.ndarray] = {}
+        self.tag_sizes: dict[str, np.ndarray] = {}
+        self.tag_bits: dict[str, np.ndarray] = {}
+
+        self.industry = np.zeros(count, dtype=np.int32)
+        self.role = np.zeros(count, dtype=np.int32)
+        self.role_group = np.zeros(count, dtype=np.int8)
+        self.location = np.zeros(count, dtype=np.int32)
+        self.region = np.zeros(count, dtype=np.int8)
+
+        for field in TAG_FIELDS:
+            vocab = self.vocab[field]
+            indptr = np.zeros(count + 1, dtype=np.int64)
+            indices: list[int] = []
+            sizes = np.zeros(count, dtype=np.int32)
+            for row, profile in enumerate(self.profiles):
+                values = _to_normalized_set(profile.get(field))
+                sizes[row] = len(values)
+                indices.extend(vocab.setdefault(value, len(vocab)) for value in sorted(values))
+                indptr[row + 1] = len(indices)
+            self.tag_indptr[field] = indptr
+            self.tag_indices[field] = np.asarray(indices, dtype=np.int32)
+            self.tag_sizes[field] = sizes
+            self.tag_bits[field] = self._pack(indptr, self.tag_indices[field], len(vocab))
+
+        for row, profile in enumerate(self.profiles):
+            industry = profile.get("industry")
+            if industry:
+                self.industry[row] = self._industries.setdefault(industry, len(self._industries) + 1)
+
+            role = profile.get("role")
+            if role:
+                self.role[row] = self._roles.setdefault(role, len(self._roles) + 1)
+                self.role_group[row] = _GROUP_CODES.get(_role_group(role), 0)
+
+            location = profile.get("location")
+            if location:
+                normalized = location.strip().lower()
+                self.location[row] = self._locations.setdefault(normalized, len(self._locations) + 1)
+                self.region[row] = _REGION_CODES.get(CITY_TO_REGION.get(normalized), 0)
+
+        self.embeddings: np.ndarray | None = None
+        self.semantic_weight = 0.0
+        self._embedding_rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    @staticmethod
+    def _pack(indptr: np.ndarray, indices: np.ndarray, vocab_size: int) -> np.ndarray:
+        count = len(indptr) - 1
+        bits = np.zeros((count, max(1, (vocab_size + 7) // 8)), dtype=np.uint8)
+        rows = np.repeat(np.arange(count), np.diff(indptr))
+        np.bitwise_or.at(bits, (rows, indices >> 3), (0x80 >> (indices & 7)).astype(np.uint8))
+        return bits
+
+    def with_embeddings(self, embeddings: np.ndarray, weight: float) -> "ProfileMatrix":
+        """A copy of this matrix that blends embedding cosine similarity into its scores.
+
+        `embeddings` holds one L2-normalized row per profile, e.g. of `profile_text`.
+        Scores become ``(1 - weight) * tag_score + weight * max(cosine, 0)``; profiles
+        without any tags get a zero vector so they gain nothing from the model.
+        """
+
+        embeddings = np.asarray(embeddings, dtype=np.float32).copy()
+        has_tags = sum(self.tag_sizes[field] for field in TAG_FIELDS) > 0
+        embeddings[~has_tags] = 0.0
+
+        matrix = copy.copy(self)
+        matrix.embeddings = embeddings
+        matrix.semantic_weight = weight
+        matrix._embedding_rows = {str(profile.get("id")): row for row, profile in enumerate(self.profiles)}
+        return matrix
+
+    def upper_bound(self, bound: float) -> float:
+        """Best possible score of a row whose tag-based score is at most `bound`."""
+
+        if self.embeddings is None:
+            return bound
+        blended = (1.0 - self.semantic_weight) * bound + self.semantic_weight
+        return math.ceil(blended * 1000 + 1e-6) / 1000
+
+    # ── Encoding ─────────────────────────────────────────────────────────
+
+    def encode(self, profile: dict) -> EncodedProfile:
+        """Express an arbitrary profile (member or not) in this matrix's vocabulary."""
+
+        tag_ids: dict[str, np.ndarray] = {}
+        tag_sizes: dict[str, int] = {}
+        for field in TAG_FIELDS:
+            values = _to_normalized_set(profile.get(field))
+            vocab = self.vocab[field]
+            tag_ids[field] = np.asarray(sorted(vocab[v] for v in values if v in vocab), dtype=np.int64)
+            tag_sizes[field] = len(values)
+
+        industry = profile.get("industry")
+        role = profile.get("role")
+        location = profile.get("location")
+        normalized = location.strip().lower() if location else ""
+        return EncodedProfile(
+            tag_ids=tag_ids,
+            tag_sizes=tag_sizes,
+            industry=self._industries.get(industry, -1) if industry else 0,
+            role=self._roles.get(role, -1) if role else 0,
+            role_group=_GROUP_CODES.get(_role_group(role), 0),
+            location=self._locations.get(normalized, -1) if location else 0,
+            region=_REGION_CODES.get(CITY_TO_REGION.get(normalized), 0) if location else 0,
+            embedding=self._member_embedding(profile),
+        )
+
+    def _member_embedding(self, profile: dict) -> np.ndarray | None:
+        # Only members have an embedding; other subjects are scored on tags alone.
+        if self.embeddings is None:
+            return None
+        row = self._embedding_rows.get(str(profile.get("id")))
+        if row is None or self.profiles[row] is not profile:
+            return None
+        return self.embeddings[row]
+
+    def encode_row(self, row: int) -> EncodedProfile:
+        tag_ids = {}
+        tag_sizes = {}
+        for field in TAG_FIELDS:
+            indptr = self.tag_indptr[field]
+            tag_ids[field] = self.tag_indices[field][indptr[row]:indptr[row + 1]].astype(np.int64)
+            tag_sizes[field] = int(self.tag_sizes[field][row])
+        return EncodedProfile(
+            tag_ids=tag_ids,
+            tag_sizes=tag_sizes,
+            industry=int(self.industry[row]),
+            role=int(self.role[row]),
+            role_group=int(self.role_group[row]),
+            location=int(self.location[row]),
+            region=int(self.region[row]),
+            embedding=None if self.embeddings is None else self.embeddings[row],
+        )
+
+    # ── Scoring ──────────────────────────────────────────────────────────
+
+    def score(self, subject: dict | EncodedProfile, rows: np.ndarray | None = None) -> np.ndarray:
+        """Similarity of one subject against every row (or only `rows`), rounded like `similarity()`."""
+
+        encoded = subject if isinstance(subject, EncodedProfile) else self.encode(subject)
+        select = slice(None) if rows is None else rows
+
+        blended = np.zeros(len(self) if rows is None else len(rows))
+        for field in TAG_FIELDS:
+            ids = encoded.tag_ids[field]
+            bits = self.tag_bits[field][select]
+            if len(ids):
+                # Intersection size: test the subject's bits directly instead of AND-ing whole rows.
+                columns = bits[:, ids >> 3]
+                inter = ((columns & (0x80 >> (ids & 7)).astype(np.uint8)) > 0).sum(axis=1)
+            else:
+                inter = np.zeros(bits.shape[0], dtype=np.int64)
+            blended = blended + WEIGHTS[field] * self._jaccard(
+                inter, self.tag_sizes[field][select], encoded.tag_sizes[field]
+            )
+
+        blended = blended + WEIGHTS["industry"] * (
+            (self.industry[select] == encoded.industry) & (encoded.industry != 0)
+        )
+        blended = blended + WEIGHTS["role"] * self._role_scores(
+            self.role[select], self.role_group[select], encoded.role, encoded.role_group
+        )
+        blended = blended + WEIGHTS["location"] * self._location_scores(
+            self.location[select], self.region[select], encoded.location, encoded.region
+        )
+        if self.embeddings is not None and encoded.embedding is not None:
+            blended = self._blend(blended, self.embeddings[select] @ encoded.embedding)
+        return _round3(blended)
+
+    def score_row(self, row: int, rows: np.ndarray | None = None) -> np.ndarray:
+        return self.score(self.encode_row(row), rows)
+
+    def score_block(self, rows: np.ndarray, columns: np.ndarray | None = None) -> np.ndarray:
+        """Similarity of each profile in `rows` against every row (or only `columns`).
+
+        The result has shape ``(len(rows), N)``, or ``(len(rows), len(columns))``.
+        """
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = slice(None) if columns is None else np.asarray(columns, dtype=np.int64)
+        blended = np.zeros((len(rows), len(self) if columns is None else len(cols)))
+        for field in TAG_FIELDS:
+            bits = self.tag_bits[field]
+            inter = _POPCOUNT[bits[rows, None, :] & bits[cols][None, :, :]].sum(axis=2, dtype=np.int32)
+            sizes = self.tag_sizes[field]
+            blended = blended + WEIGHTS[field] * self._jaccard(inter, sizes[cols][None, :], sizes[rows, None])
+
+        industry = self.industry[cols]
+        blended = blended + WEIGHTS["industry"] * (
+            (industry[None, :] == self.industry[rows, None]) & (self.industry[rows, None] != 0)
+        )
+        blended = blended + WEIGHTS["role"] * self._role_scores(
+            self.role[cols][None, :], self.role_group[cols][None, :], self.role[rows, None], self.role_group[rows, None]
+        )
+        blended = blended + WEIGHTS["location"] * self._location_scores(
+            self.location[cols][None, :], self.region[cols][None, :], self.location[rows, None], self.region[rows, None]
+        )
+        if self.embeddings is not None:
+            blended = self._blend(blended, self.embeddings[rows] @ self.embeddings[cols].T)
+        return _round3(blended)
+
+    def block_size(self) -> int:
+        """Subject rows per `score_block` call that keep the temporary tag tensor within budget."""
+
+        width = max(bits.shape[1] for bits in self.tag_bits.values())
+        return max(1, _BLOCK_BUDGET // max(1, len(self) * width))
+
+    def iter_blocks(self, block_size: int | None = None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(rows, scores)`` blocks covering the full N×N similarity matrix."""
+
+        size = block_size or self.block_size()
+        for start in range(0, len(self), size):
+            rows = np.arange(start, min(start + size, len(self)))
+            yield rows, self.score_block(rows)
+
+    # ── Components ───────────────────────────────────────────────────────
+
+    def _blend(self, scores: np.ndarray, cosine: np.ndarray) -> np.ndarray:
+        weight = self.semantic_weight
+        return (1.0 - weight) * scores + weight * np.clip(cosine, 0.0, 1.0)
+
+    @staticmethod
+    def _jaccard(inter: np.ndarray, sizes: np.ndarray, subject_sizes) -> np.ndarray:
+        union = sizes + subject_sizes - inter
+        valid = (sizes > 0) & (np.asarray(subject_sizes) > 0)
+        return np.where(valid, inter / np.where(valid, union, 1), 0.0)
+
+    @staticmethod
+    def _role_scores(roles, groups, subject_role, subject_group) -> np.ndarray:
+        present = (roles != 0) & (np.asarray(subject_role) != 0)
+        scores = np.where(roles == subject_role, 0.7, _GROUP_SCORES[groups, subject_group])
+        return np.where(present, scores, 0.0)
+
+    @staticmethod
+    def _location_scores(locations, regions, subject_location, subject_region) -> np.ndarray:
+        present = (locations != 0) & (np.asarray(subject_location) != 0)
+        same_region = (regions == subject_region) & (regions != 0)
+        scores = np.where(locations == subject_location, 1.0, np.where(same_region, 0.6, 0.0))
+        return np.where(present, scores, 0.0)
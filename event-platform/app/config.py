@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Dict, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -35,6 +37,29 @@ class Settings(BaseSettings):
     app_url: str
     api_url: str
 
+    # Registrations
+    registration_hold_minutes: int = 30
+    registration_sweep_interval_seconds: int = 60
+    registration_sweep_batch_size: int = 5000
+    metadata_cache_ttl_seconds: int = 30
+
+    # AI
+    rag_backend: str = "auto"
+    rag_retrieval_mode: str = "auto"
+    rag_preload_model: bool = True
+    rag_embedding_cache_size: int = 10000
+    rag_embedding_cache_path: Optional[str] = None
+    rag_encode_batch_size: int = 64
+    rag_encode_max_wait_ms: float = 5.0
+    rag_snapshot_ttl_seconds: int = 60
+    # Recall vs. latency of the IVF index: see RAG_ANN_* in .env.example.
+    rag_ann_min_documents: int = 50000
+    rag_ann_nprobe: int = 64
+    ai_thread_workers: int = 4
+    ai_process_workers: int = 0
+    ai_task_modes: Dict[str, str] = {}
+    networking_semantic_weight: float = 0.0
+
     class Config:
         env_file = ".env"
 
@@ -42,6 +42,9 @@ async def _create_indexes() -> None:
         await database.ticket_types.create_index("event_id")
         await database.ticket_types.create_index("is_active")
         await database.ticket_types.create_index("sort_order")
+        await database.ticket_counters.create_index(
+            [("ticket_type_id", 1), ("shard", 1)], unique=True
+        )
 
         await database.registrations.create_index(
             [("event_id", 1), ("email", 1)], unique=True
@@ -51,6 +54,16 @@ async def _create_indexes() -> None:
         await database.registrations.create_index("status")
         await database.registrations.create_index("qr_code", unique=True)
         await database.registrations.create_index("created_at")
+        await database.registrations.create_index([("status", 1), ("payment_required", 1), ("created_at", 1)])
+        await database.registrations.create_index("sweep_id", sparse=True)
+        await database.registrations.create_index("releasing", sparse=True)
+
+        await database.networking_matches.create_index(
+            [("event_id", 1), ("attendee_id", 1)], unique=True
+        )
+        await database.networking_match_runs.create_index(
+            [("event_id", 1), ("fingerprint", 1)]
+        )
 
         await database.waitlist_entries.create_index(
             [("event_id", 1), ("ticket_type_id", 1), ("position", 1)]
@@ -60,9 +73,24 @@ async def _create_indexes() -> None:
         print(f"Warning: index creation failed: {exc}")
 
 
+async def _migrate() -> None:
+    database = await get_database()
+
+    try:
+        # Registrations from before `payment_required` existed: the expiry sweep only
+        # releases holds that still need payment, so derive it from the price.
+        await database.registrations.update_many(
+            {"status": "pending", "payment_required": {"$exists": False}},
+            [{"$set": {"payment_required": {"$gt": ["$final_price", 0]}}}],
+        )
+    except PyMongoError as exc:
+        print(f"Warning: migration failed: {exc}")
+
+
 async def connect_to_mongo() -> None:
     db.client = AsyncIOMotorClient(settings.mongodb_url)
     await _create_indexes()
+    await _migrate()
     print("Connected to MongoDB")
 
 
@@ -0,0 +1 @@
+"""Offline batch jobs, run as ``python -m app.jobs.<name>``."""
@@ -0,0 +1,49 @@
+"""Precompute the top networking matches of every attendee of one or more events.
+
+Meant to run nightly (e.g. from cron) ahead of large conferences::
+
+    python -m app.jobs.precompute_matches <event_id> [<event_id> ...] --top-k 20 --workers 4
+
+Re-running after an interruption resumes from the last completed block as long as
+the event's attendee profiles have not changed in the meantime.
+"""
+
+import argparse
+import asyncio
+
+from app.database import close_mongo_connection, connect_to_mongo
+from app.services.networking_service import networking_service
+
+
+async def run(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        for event_id in args.event_ids:
+            stats = await networking_service.precompute_matches(
+                event_id,
+                top_k=args.top_k,
+                workers=args.workers,
+                block_size=args.block_size,
+                restart=args.restart,
+            )
+            print(
+                f"{event_id}: {stats['attendees']} attendees, {stats['rows']} rows in "
+                f"{stats['seconds']}s ({stats['rows_per_sec']} rows/sec, "
+                f"{stats['resumed_blocks']}/{stats['blocks']} blocks resumed)"
+            )
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("event_ids", nargs="+", metavar="event_id")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--block-size", type=int, default=None, help="attendee rows per block")
+    parser.add_argument("--restart", action="store_true", help="ignore progress of an interrupted run")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
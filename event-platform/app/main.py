@@ -4,6 +4,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import close_mongo_connection, connect_to_mongo
 from app.routers import ai, auth_router, events, organizations, payment, registration, tickets, waitlist
+from app.services.ai_executor import ai_executor
+from app.services.rag_service import rag_service
+from app.services.registration_sweeper import registration_sweeper
 
 app = FastAPI(
     title="Event Platform API",
@@ -23,11 +26,17 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    registration_sweeper.start()
+    if settings.rag_preload_model:
+        # Loads in a background thread; requests use the lexical backend meanwhile.
+        rag_service.engine.start_loading()
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await registration_sweeper.stop()
     await close_mongo_connection()
+    ai_executor.shutdown()
 
 
 app.include_router(auth_router.router)
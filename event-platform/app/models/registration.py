@@ -13,6 +13,7 @@ class RegistrationStatus(str, Enum):
     CANCELLED = "cancelled"
     WAITLIST = "waitlist"
     REJECTED = "rejected"
+    EXPIRED = "expired"
 
 
 class PaymentStatus(str, Enum):
@@ -23,6 +24,14 @@ class PaymentStatus(str, Enum):
     PARTIALLY_REFUNDED = "partially_refunded"
 
 
+class PaymentConfirmation(str, Enum):
+    CONFIRMED = "confirmed"
+    # Unknown, already confirmed, or cancelled: nothing was changed.
+    NOT_PENDING = "not_pending"
+    # Paid after the hold expired and the seats were sold meanwhile; flagged for a refund.
+    SOLD_OUT = "sold_out"
+
+
 class PaymentMethod(str, Enum):
     STRIPE = "stripe"
     PAYPAL = "paypal"
@@ -48,10 +57,16 @@ class Registration(MongoModel):
     is_group_lead: bool = False
     group_id: Optional[str] = None
     group_size: int = 1
+    # Group lead whose payment confirmed this member of a bulk order.
+    paid_by_registration_id: Optional[str] = None
+    # Ticket counter shard holding this registration's seats (sharded ticket types only).
+    counter_shard: Optional[int] = None
 
     original_price: float
     discount_amount: float = 0.0
     final_price: float
+    # Whether the order costs anything; unpaid orders expire after the hold, free ones never do.
+    payment_required: bool = False
     discount_code: Optional[str] = None
     applied_discount_type: Optional[str] = None
     discount_details: Optional[Dict[str, Any]] = None
@@ -62,6 +77,9 @@ class Registration(MongoModel):
     paypal_order_id: Optional[str] = None
     payment_date: Optional[datetime] = None
     transaction_id: Optional[str] = None
+    # Paid for, but no ticket could be issued; the payment has to be refunded.
+    refund_required: bool = False
+    refund_id: Optional[str] = None
 
     qr_code: str
     qr_code_image: Optional[str] = None
@@ -29,6 +29,9 @@ class TicketType(MongoModel):
     capacity: Optional[int] = None
     sold_count: int = 0
     reserved: int = 0
+    # > 1 splits capacity across that many `TicketCounter` documents; sold_count and
+    # reserved then live on the counters.
+    counter_shards: int = 0
 
     waitlist_enabled: bool = False
     waitlist_capacity: Optional[int] = None
@@ -52,3 +55,17 @@ class TicketType(MongoModel):
                 "capacity": 100,
             }
         }
+
+
+class TicketCounter(MongoModel):
+    """One shard of a ticket type's capacity (collection ``ticket_counters``)."""
+
+    ticket_type_id: str
+    shard: int
+    capacity: int
+    sold_count: int = 0
+    reserved: int = 0
+    # Seats given to another shard that it has not been credited with yet.
+    pending_transfers: List[dict] = Field(default_factory=list)
+    # Ids of the latest transfers credited to this shard.
+    received_transfers: List[str] = Field(default_factory=list)
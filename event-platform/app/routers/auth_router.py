@@ -16,6 +16,8 @@ from app.auth import (
     verify_password,
 )
 from app.database import get_database
+from app.services.networking_service import networking_service
+from app.services.rag_service import rag_service
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -101,6 +103,7 @@ async def signup(body: SignupRequest):
 
     result = await db.users.insert_one(user_doc)
     user_doc["_id"] = result.inserted_id
+    rag_service.invalidate()
 
     token = create_access_token({"sub": str(result.inserted_id)})
 
@@ -163,6 +166,8 @@ async def update_profile(
             updates[field] = val
 
     await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": updates})
+    await networking_service.refresh_user(user_id)
+    rag_service.invalidate()
 
     user = await db.users.find_one({"_id": ObjectId(user_id)})
     return _serialize_user(user)
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Query
 from app.database import get_database
 from app.models.event import Event
 from app.schemas.event import EventCreate, EventResponse
+from app.services.rag_service import rag_service
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 
@@ -47,6 +48,7 @@ async def create_event(event_payload: EventCreate):
     payload["slug"] = slug
     event = Event(**payload)
     result = await db.events.insert_one(event.model_dump(by_alias=True, exclude={"id"}))
+    rag_service.invalidate()
     created = await db.events.find_one({"_id": result.inserted_id})
     created["id"] = str(created["_id"])
     created["_id"] = str(created["_id"])
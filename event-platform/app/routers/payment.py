@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Request
 import stripe
 
 from app.config import settings
+from app.models.registration import PaymentConfirmation
 from app.services.payment_service import payment_service
 from app.services.registration_service import registration_service
 
@@ -45,7 +46,7 @@ async def stripe_webhook(request: Request):
         payment_intent = event["data"]["object"]
         registration_id = payment_intent["metadata"].get("registration_id")
         if registration_id:
-            await registration_service.confirm_payment(
+            outcome = await registration_service.confirm_payment(
                 registration_id,
                 {
                     "payment_method": "stripe",
@@ -53,6 +54,13 @@ async def stripe_webhook(request: Request):
                     "transaction_id": payment_intent["id"],
                 },
             )
+            if outcome is PaymentConfirmation.SOLD_OUT:
+                # Paid after the hold expired and the seats are gone. Answer 200 so Stripe
+                # does not redeliver; the registration stays flagged if the refund fails.
+                refund = await payment_service.refund_stripe_payment(payment_intent["id"])
+                if refund["success"]:
+                    await registration_service.record_refund(registration_id, refund)
+                return {"success": False, "reason": outcome.value, "refunded": refund["success"]}
 
     return {"success": True}
 
@@ -84,7 +92,7 @@ async def execute_paypal_payment(payment_id: str, payer_id: str, registration_id
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["error"])
 
-        await registration_service.confirm_payment(
+        outcome = await registration_service.confirm_payment(
             registration_id,
             {
                 "payment_method": "paypal",
@@ -92,7 +100,16 @@ async def execute_paypal_payment(payment_id: str, payer_id: str, registration_id
                 "transaction_id": payment_id,
             },
         )
+        if outcome is PaymentConfirmation.SOLD_OUT:
+            raise HTTPException(
+                status_code=409,
+                detail="The registration expired and its tickets are sold out; the payment will be refunded",
+            )
+        if outcome is not PaymentConfirmation.CONFIRMED:
+            raise HTTPException(status_code=400, detail="Payment confirmation failed")
 
         return {"success": True, "message": "Payment completed successfully"}
+    except HTTPException:
+        raise
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -7,10 +7,13 @@ from fastapi import APIRouter, BackgroundTasks, HTTPException
 from fastapi.responses import StreamingResponse
 
 from app.database import get_database
+from app.models.registration import PaymentConfirmation
 from app.schemas.registration import (
+    BulkRegistrationCreate,
     PricingCalculation,
     RegistrationCreate,
 )
+from app.services.metadata_cache import RequestLoader
 from app.services.pricing_service import pricing_service
 from app.services.registration_service import registration_service
 from app.utils.export import export_service
@@ -70,6 +73,26 @@ async def create_registration(
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@router.post("/bulk", response_model=dict)
+async def create_bulk_registration(
+    registration: BulkRegistrationCreate,
+    user_id: Optional[str] = None,
+):
+    """Register a group in one order; pay for the lead registration to confirm everyone."""
+
+    try:
+        result = await registration_service.create_bulk_registration(
+            registration.model_dump(),
+            user_id,
+        )
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["reason"])
+    return result
+
+
 @router.get("/{registration_id}", response_model=dict)
 async def get_registration(registration_id: str):
     db = await get_database()
@@ -80,10 +103,9 @@ async def get_registration(registration_id: str):
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
 
-    event = await db.events.find_one({"_id": ObjectId(registration["event_id"])})
-    ticket_type = await db.ticket_types.find_one(
-        {"_id": ObjectId(registration["ticket_type_id"])}
-    )
+    loader = RequestLoader()
+    event = await loader.event(registration["event_id"])
+    ticket_type = await loader.ticket_type(registration["ticket_type_id"])
 
     registration["_id"] = str(registration["_id"])
     registration["event_name"] = event.get("name") if event else None
@@ -99,13 +121,20 @@ async def confirm_payment(
     background_tasks: BackgroundTasks,
 ):
     try:
-        success = await registration_service.confirm_payment(
+        outcome = await registration_service.confirm_payment(
             registration_id,
             payment_data,
         )
-        if not success:
+        if outcome is PaymentConfirmation.SOLD_OUT:
+            raise HTTPException(
+                status_code=409,
+                detail="The registration expired and its tickets are sold out; the payment will be refunded",
+            )
+        if outcome is not PaymentConfirmation.CONFIRMED:
             raise HTTPException(status_code=400, detail="Payment confirmation failed")
         return {"success": True, "message": "Payment confirmed successfully"}
+    except HTTPException:
+        raise
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -184,9 +213,10 @@ async def export_registrations_csv(event_id: str):
     db = await get_database()
     registrations = await db.registrations.find({"event_id": event_id}).to_list(10000)
 
+    loader = RequestLoader()
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(reg["ticket_type_id"])})
+        ticket_type = await loader.ticket_type(reg["ticket_type_id"])
         reg["ticket_type_name"] = ticket_type.get("name") if ticket_type else ""
 
     csv_data = await export_service.export_registrations_csv(registrations)
@@ -205,9 +235,10 @@ async def export_registrations_excel(event_id: str):
     db = await get_database()
     registrations = await db.registrations.find({"event_id": event_id}).to_list(10000)
 
+    loader = RequestLoader()
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(reg["ticket_type_id"])})
+        ticket_type = await loader.ticket_type(reg["ticket_type_id"])
         reg["ticket_type_name"] = ticket_type.get("name") if ticket_type else ""
 
     excel_data = await export_service.export_registrations_excel(registrations)
@@ -7,6 +7,8 @@ from fastapi import APIRouter, HTTPException
 from app.database import get_database
 from app.models.ticket import TicketType
 from app.schemas.ticket import TicketTypeCreate
+from app.services.metadata_cache import metadata_cache
+from app.services.ticket_counter_service import ticket_counter_service
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
@@ -15,9 +17,14 @@ router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 async def create_ticket_type(ticket: TicketTypeCreate):
     db = await get_database()
     ticket_doc = TicketType(**ticket.model_dump())
+    if not ticket_doc.capacity or ticket_doc.counter_shards < 2:
+        # Unlimited tickets have nothing to count; one shard is the plain counter.
+        ticket_doc.counter_shards = 0
     result = await db.ticket_types.insert_one(
         ticket_doc.model_dump(by_alias=True, exclude={"id"})
     )
+    if ticket_doc.counter_shards:
+        await ticket_counter_service.create(str(result.inserted_id), ticket_doc.capacity, ticket_doc.counter_shards)
     return {"success": True, "ticket_id": str(result.inserted_id)}
 
 
@@ -28,11 +35,15 @@ async def get_event_tickets(event_id: str, active_only: bool = True):
     if active_only:
         query["is_active"] = True
 
-    tickets = await db.ticket_types.find(query).sort("sort_order", 1).to_list(100)
+    tickets = await db.ticket_types.find(query, {"released_sweeps": 0}).sort("sort_order", 1).to_list(100)
     now = datetime.utcnow()
+    counters = await ticket_counter_service.totals(
+        [str(ticket["_id"]) for ticket in tickets if ticket.get("counter_shards", 0) > 1]
+    )
 
     for ticket in tickets:
         ticket["_id"] = str(ticket["_id"])
+        ticket.update(counters.get(ticket["_id"], {}))
         current_price = ticket["base_price"]
 
         if ticket.get("is_early_bird") and ticket.get("early_bird_price"):
@@ -66,11 +77,16 @@ async def get_event_tickets(event_id: str, active_only: bool = True):
 @router.patch("/{ticket_id}", response_model=dict)
 async def update_ticket_type(ticket_id: str, update_data: dict):
     db = await get_database()
+    # Sharding is fixed when the ticket type is created.
+    update_data.pop("counter_shards", None)
     update_data["updated_at"] = datetime.utcnow()
-    result = await db.ticket_types.update_one(
+    previous = await db.ticket_types.find_one_and_update(
         {"_id": ObjectId(ticket_id)},
         {"$set": update_data},
     )
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Ticket type not found")
+    metadata_cache.invalidate("ticket_types", ticket_id)
+    if previous.get("counter_shards", 0) > 1 and update_data.get("capacity") is not None:
+        await ticket_counter_service.resize(ticket_id, update_data["capacity"] - previous["capacity"])
     return {"success": True, "message": "Ticket type updated"}
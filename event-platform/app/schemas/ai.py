@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -9,6 +9,10 @@ class NetworkingRequest(BaseModel):
     user: dict
     attendees: list[dict]
     limit: int = Field(default=3, ge=1, le=20)
+    # 0 ranks by score alone; higher values trade score for variety (MMR).
+    diversity: float = Field(default=0.0, ge=0.0, le=1.0)
+    # False skips the reason and conversation-starter text (both returned empty).
+    explain: bool = True
 
 
 class NetworkingRecommendation(BaseModel):
@@ -22,15 +26,35 @@ class NetworkingRecommendation(BaseModel):
 class RagChatRequest(BaseModel):
     query: str
     snapshot: Optional[dict] = None
+    top_k: int = Field(default=1, ge=1, le=20)
+    # Overrides RAG_RETRIEVAL_MODE for this query.
+    mode: Optional[Literal["auto", "dense", "lexical", "hybrid"]] = None
+    # Only search these document sources and/or documents of this event.
+    sources: Optional[list[Literal["faq", "event", "attendee", "session"]]] = None
+    event_id: Optional[str] = None
+
+
+class RagPassage(BaseModel):
+    answer: str
+    source: Optional[str] = None
+    score: float = 0.0
+    scores: dict[str, float] = Field(default_factory=dict)
+    metadata: dict[str, Any] = Field(default_factory=dict)
 
 
 class RagChatResponse(BaseModel):
     answer: str
     source: Optional[str] = None
     score: float = 0.0
+    scores: dict[str, float] = Field(default_factory=dict)
     metadata: dict[str, Any] = Field(default_factory=dict)
+    passages: list[RagPassage] = Field(default_factory=list)
 
 
 class AiHealthResponse(BaseModel):
     ok: bool
     rag_backend: str
+    rag_model_state: str = "disabled"
+    embedding_cache: dict[str, int] = Field(default_factory=dict)
+    embedding_batches: dict[str, int] = Field(default_factory=dict)
+    executor: dict[str, Any] = Field(default_factory=dict)
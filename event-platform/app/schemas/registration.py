@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -27,6 +27,33 @@ class RegistrationCreate(BaseModel):
         return value
 
 
+class BulkAttendee(BaseModel):
+    first_name: str
+    last_name: str
+    email: EmailStr
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    job_title: Optional[str] = None
+    form_responses: Optional[Dict[str, Any]] = None
+
+
+class BulkRegistrationCreate(BaseModel):
+    """One order for several people; the first attendee is the group lead."""
+
+    event_id: str
+    ticket_type_id: str
+    attendees: List[BulkAttendee] = Field(min_length=1, max_length=50)
+    discount_code: Optional[str] = None
+
+    @field_validator("attendees")
+    @classmethod
+    def validate_unique_emails(cls, value: List[BulkAttendee]) -> List[BulkAttendee]:
+        emails = [attendee.email.lower() for attendee in value]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Each attendee needs a different email")
+        return value
+
+
 class RegistrationResponse(BaseModel):
     id: str
     event_id: str
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models.ticket import GroupDiscountRule
 
@@ -18,6 +18,8 @@ class TicketTypeCreate(BaseModel):
     group_discount_enabled: bool = False
     group_discount_rules: Optional[List[GroupDiscountRule]] = None
     capacity: Optional[int] = None
+    # Split capacity across this many counter documents for high-concurrency sales.
+    counter_shards: int = Field(default=0, ge=0, le=64)
     waitlist_enabled: bool = False
     valid_from: Optional[datetime] = None
     valid_until: Optional[datetime] = None
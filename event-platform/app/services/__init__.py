@@ -1,13 +1,27 @@
+from .ai_executor import ai_executor
 from .email_service import email_service
+from .inventory_service import inventory_service
+from .metadata_cache import metadata_cache
+from .networking_service import networking_service
 from .payment_service import payment_service
 from .pricing_service import pricing_service
 from .qrcode_service import qrcode_service
+from .rag_service import rag_service
 from .registration_service import registration_service
+from .registration_sweeper import registration_sweeper
+from .ticket_counter_service import ticket_counter_service
 
 __all__ = [
+    "ai_executor",
     "email_service",
+    "inventory_service",
+    "metadata_cache",
+    "networking_service",
     "payment_service",
     "pricing_service",
     "qrcode_service",
+    "rag_service",
     "registration_service",
+    "registration_sweeper",
+    "ticket_counter_service",
 ]
@@ -0,0 +1,9 @@
+from app.ai.executor import AiExecutor
+from app.config import settings
+
+# Shared by the AI router and services so CPU-bound scoring stays off the event loop.
+ai_executor = AiExecutor(
+    thread_workers=settings.ai_thread_workers,
+    process_workers=settings.ai_process_workers or None,
+    modes=settings.ai_task_modes,
+)
@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.database import get_database
+from app.services.metadata_cache import RequestLoader
+from app.services.pricing_service import pricing_service
+from app.services.ticket_counter_service import ticket_counter_service
+
+
+class InventoryService:
+    """Reserves ticket inventory with one conditional update on the ticket type.
+
+    The filter carries every check `PricingService.check_availability` makes (active,
+    inside the sales window, ``capacity - sold_count - reserved >= quantity``), so
+    concurrent requests cannot both take the last seats and a successful sale costs a
+    single round trip. The slower availability check only runs to explain a refusal.
+
+    Ticket types with ``counter_shards > 1`` (known from their cached metadata) reserve
+    on one of their `TicketCounterService` counters instead; the shard is returned as
+    ``counter_shard`` and must be passed back to `release` / `confirm`.
+    """
+
+    def _reservable(self, ticket_type_id: str, quantity: int, now: datetime) -> Dict[str, Any]:
+        return {
+            "_id": ObjectId(ticket_type_id),
+            "is_active": True,
+            "counter_shards": {"$not": {"$gt": 1}},
+            "$and": [
+                {"$or": [{"valid_from": None}, {"valid_from": {"$lte": now}}]},
+                {"$or": [{"valid_until": None}, {"valid_until": {"$gte": now}}]},
+                {
+                    "$or": [
+                        # No capacity (None or 0) means unlimited, as in check_availability.
+                        {"capacity": None},
+                        {"capacity": 0},
+                        {
+                            "$expr": {
+                                "$gte": [
+                                    {
+                                        "$subtract": [
+                                            "$capacity",
+                                            {"$add": [{"$ifNull": ["$sold_count", 0]}, {"$ifNull": ["$reserved", 0]}]},
+                                        ]
+                                    },
+                                    quantity,
+                                ]
+                            }
+                        },
+                    ]
+                },
+            ],
+        }
+
+    async def reserve(
+        self,
+        ticket_type_id: str,
+        quantity: int = 1,
+        loader: Optional[RequestLoader] = None,
+    ) -> Dict[str, Any]:
+        """Reserve `quantity` tickets, or explain why not.
+
+        Returns ``{"available": True, "ticket": <ticket type>}`` on success and a
+        `check_availability`-shaped refusal otherwise. The updated ticket type is also
+        seeded into `loader`, so pricing the request does not read it again.
+        """
+
+        loader = loader or RequestLoader()
+        metadata = await loader.ticket_type(ticket_type_id)
+        if metadata and metadata.get("counter_shards", 0) > 1 and metadata.get("capacity"):
+            if self._on_sale(metadata):
+                shard = await ticket_counter_service.reserve(ticket_type_id, metadata["counter_shards"], quantity)
+                if shard is not None:
+                    return {"available": True, "ticket": metadata, "counter_shard": shard}
+        elif metadata:
+            db = await get_database()
+            ticket = await db.ticket_types.find_one_and_update(
+                self._reservable(ticket_type_id, quantity, datetime.utcnow()),
+                {"$inc": {"reserved": quantity}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if ticket is not None:
+                loader.seed("ticket_types", ticket)
+                return {"available": True, "ticket": ticket}
+
+        availability = await pricing_service.check_availability(ticket_type_id, quantity, loader)
+        if availability["available"]:
+            # Seats were released between the two reads; treat it as losing the race.
+            return {
+                "available": False,
+                "reason": "Not enough tickets available",
+                "waitlist_available": bool(metadata.get("waitlist_enabled")),
+            }
+        return availability
+
+    @staticmethod
+    def _on_sale(ticket: Dict[str, Any]) -> bool:
+        now = datetime.utcnow()
+        return (
+            ticket.get("is_active", True)
+            and (ticket.get("valid_from") is None or ticket["valid_from"] <= now)
+            and (ticket.get("valid_until") is None or ticket["valid_until"] >= now)
+        )
+
+    async def release(self, ticket_type_id: str, quantity: int = 1, counter_shard: Optional[int] = None) -> None:
+        """Give back `quantity` reserved tickets, e.g. when the registration insert fails."""
+
+        if counter_shard is not None:
+            await ticket_counter_service.release(ticket_type_id, counter_shard, quantity)
+            return
+        db = await get_database()
+        await db.ticket_types.update_one(
+            {"_id": ObjectId(ticket_type_id)},
+            {"$inc": {"reserved": -quantity}},
+        )
+
+    async def confirm(self, ticket_type_id: str, quantity: int = 1, counter_shard: Optional[int] = None) -> None:
+        """Turn `quantity` reserved tickets into sold ones once payment is confirmed."""
+
+        if counter_shard is not None:
+            await ticket_counter_service.confirm(ticket_type_id, counter_shard, quantity)
+            return
+        db = await get_database()
+        await db.ticket_types.update_one(
+            {"_id": ObjectId(ticket_type_id)},
+            {"$inc": {"reserved": -quantity, "sold_count": quantity}},
+        )
+
+
+inventory_service = InventoryService()
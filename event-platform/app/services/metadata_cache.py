@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_database
+
+# Fields that change on every sale (or expiry sweep); they are never cached.
+COUNTER_FIELDS = {
+    "events": ("registered_count", "revenue"),
+    "ticket_types": ("sold_count", "reserved", "early_bird_sold", "released_sweeps"),
+}
+
+_Key = Tuple[str, str]
+
+
+class MetadataCache:
+    """Per-process read-through cache of event and ticket-type metadata.
+
+    Entries hold names, prices, discount rules and sales windows, never the counters
+    in `COUNTER_FIELDS`, and live for `metadata_cache_ttl_seconds`. Concurrent misses
+    for the same document share one MongoDB read. Writers call `invalidate`; other
+    API processes see a change once their entry expires.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[_Key, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._loading: Dict[_Key, asyncio.Future] = {}
+        self._generations: Dict[_Key, int] = {}
+
+    async def get(self, collection: str, document_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one document (a copy the caller may modify), or ``None`` if it does not exist."""
+
+        key = (collection, document_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return dict(entry[1]) if entry[1] is not None else None
+
+        self.misses += 1
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(collection, document_id))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda done: self._loading.pop(key) if self._loading.get(key) is done else None)
+        document = await asyncio.shield(loading)
+        return dict(document) if document is not None else None
+
+    async def _load(self, collection: str, document_id: str) -> Optional[Dict[str, Any]]:
+        if not ObjectId.is_valid(document_id):
+            return None
+        key = (collection, document_id)
+        generation = self._generations.get(key, 0)
+        db = await get_database()
+        projection = {field: 0 for field in COUNTER_FIELDS.get(collection, ())}
+        document = await db[collection].find_one({"_id": ObjectId(document_id)}, projection or None)
+        # Invalidated while loading: serve this read but do not cache it.
+        if self._generations.get(key, 0) == generation:
+            self._entries[key] = (time.monotonic() + self.ttl, document)
+        return document
+
+    async def event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return await self.get("events", event_id)
+
+    async def ticket_type(self, ticket_type_id: str) -> Optional[Dict[str, Any]]:
+        return await self.get("ticket_types", ticket_type_id)
+
+    def invalidate(self, collection: str, document_id: str) -> None:
+        key = (collection, document_id)
+        self._entries.pop(key, None)
+        self._loading.pop(key, None)
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class RequestLoader:
+    """Documents fetched while serving one request, so each is read at most once.
+
+    Metadata comes from `metadata_cache`. ``counters=True`` asks for the live document
+    (counters included): it is read from MongoDB once, or taken from `seed`, e.g. the
+    ticket type returned by the reservation update.
+    """
+
+    def __init__(self, cache: Optional[MetadataCache] = None) -> None:
+        self.cache = cache or metadata_cache
+        self._documents: Dict[_Key, Tuple[bool, Optional[Dict[str, Any]]]] = {}
+
+    def seed(self, collection: str, document: Dict[str, Any], counters: bool = True) -> None:
+        self._documents[(collection, str(document["_id"]))] = (counters, document)
+
+    async def get(self, collection: str, document_id: str, counters: bool = False) -> Optional[Dict[str, Any]]:
+        key = (collection, document_id)
+        known = self._documents.get(key)
+        if known is not None and (known[0] or not counters):
+            return known[1]
+        if counters and ObjectId.is_valid(document_id):
+            db = await get_database()
+            document = await db[collection].find_one({"_id": ObjectId(document_id)})
+        elif counters:
+            document = None
+        else:
+            document = await self.cache.get(collection, document_id)
+        self._documents[key] = (counters, document)
+        return document
+
+    async def event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return await self.get("events", event_id)
+
+    async def ticket_type(self, ticket_type_id: str, counters: bool = False) -> Optional[Dict[str, Any]]:
+        return await self.get("ticket_types", ticket_type_id, counters)
+
+
+metadata_cache = MetadataCache(settings.metadata_cache_ttl_seconds)
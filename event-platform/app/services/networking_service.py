@@ -0,0 +1,447 @@
+import asyncio
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from app.ai.match_precompute import init_worker, score_block, top_k_block
+from app.ai.networking import build_match, candidate_pool, conversation_starter, rerank_diverse
+from app.ai.profile_index import EventProfileIndex
+from app.ai.vectorized import ProfileMatrix, profile_text
+from app.config import settings
+from app.database import get_database
+from app.models.registration import RegistrationStatus
+
+from .ai_executor import ai_executor
+from .rag_service import rag_service
+
+_USER_FIELDS = {
+    "name": 1,
+    "company": 1,
+    "industry": 1,
+    "interests": 1,
+    "skills": 1,
+    "goals": 1,
+    "location": 1,
+    "role": 1,
+}
+
+# Rows in the first streamed block, kept small so the first lines go out quickly.
+_FIRST_STREAM_BLOCK = 32
+
+
+def _form_list(form_responses: Dict[str, Any], key: str) -> List[str]:
+    raw = form_responses.get(key)
+    if isinstance(raw, list):
+        return [str(x) for x in raw if x]
+    if isinstance(raw, str):
+        return [s.strip() for s in raw.split(",") if s.strip()]
+    return []
+
+
+def build_profile(registration: Dict[str, Any], user: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Networking profile for an attendee: user profile fields, falling back to the registration."""
+
+    user = user or {}
+    form_responses = registration.get("form_responses")
+    if not isinstance(form_responses, dict):
+        form_responses = {}
+
+    name = " ".join([registration.get("first_name") or "", registration.get("last_name") or ""]).strip()
+    return {
+        "id": str(registration.get("user_id") or registration["_id"]),
+        "name": user.get("name") or name or "Attendee",
+        "company": user.get("company") or registration.get("company"),
+        "industry": user.get("industry") or form_responses.get("industry"),
+        "role": registration.get("job_title") or user.get("role"),
+        "location": user.get("location") or form_responses.get("location"),
+        "interests": user.get("interests") or _form_list(form_responses, "interests"),
+        "skills": user.get("skills") or _form_list(form_responses, "skills"),
+        "goals": user.get("goals") or _form_list(form_responses, "goals"),
+    }
+
+
+def _recommendation_lines(
+    matrix: ProfileMatrix,
+    start: int,
+    stop: int,
+    limit: int,
+    diversity: float = 0.0,
+    explain: bool = True,
+) -> bytes:
+    """NDJSON lines with the top `limit` matches of matrix rows ``start:stop``."""
+
+    top_rows, top_scores = top_k_block(matrix, np.arange(start, stop), candidate_pool(limit, diversity))
+    lines = []
+    for row, best, scores in zip(range(start, stop), top_rows, top_scores):
+        subject = matrix.profiles[row]
+        if diversity > 0:
+            best, scores = rerank_diverse(matrix, best, scores, limit, diversity)
+        matches = []
+        for candidate_row, score in zip(best, scores):
+            entry = build_match(subject, matrix.profiles[candidate_row], score, explain=explain)
+            candidate = entry["match"]
+            match = {
+                "id": candidate["id"],
+                "name": candidate.get("name"),
+                "company": candidate.get("company"),
+                "role": candidate.get("role"),
+                "score": score,
+            }
+            if explain:
+                match["reason"] = entry["reason"]
+                match["starter"] = conversation_starter(subject, candidate, entry["overlap"])
+            matches.append(match)
+        lines.append(json.dumps({"attendee_id": subject["id"], "name": subject.get("name"), "matches": matches}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class NetworkingService:
+    """Keeps a per-event attendee profile index in memory for networking recommendations.
+
+    An event's index is loaded from `registrations` and `users` on first use and then
+    patched in place when a profile changes or a registration is confirmed.
+
+    With `networking_semantic_weight` > 0, scores also blend the embedding similarity
+    of attendees' interests, skills and goals, using the RAG engine's model and
+    embedding cache (so unchanged profiles are never re-encoded).
+    """
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, EventProfileIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.semantic_weight = settings.networking_semantic_weight
+
+    async def get_index(self, event_id: str) -> EventProfileIndex:
+        index = self._indexes.get(event_id)
+        if index is not None:
+            return index
+
+        lock = self._locks.setdefault(event_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(event_id)
+            if index is None:
+                index = EventProfileIndex(
+                    event_id,
+                    await self._load_profiles(event_id),
+                    embed=rag_service.engine.embed if self.semantic_weight > 0 else None,
+                    semantic_weight=self.semantic_weight,
+                )
+                self._indexes[event_id] = index
+        return index
+
+    def invalidate(self, event_id: Optional[str] = None) -> None:
+        """Drop one event's index (or all of them) so it is reloaded from MongoDB."""
+
+        if event_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(event_id, None)
+
+    async def recommend(
+        self,
+        event_id: str,
+        attendee_id: str,
+        limit: int = 3,
+        diversity: float = 0.0,
+        explain: bool = True,
+    ) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Subject profile and its top matches, or ``None`` if the attendee is not indexed.
+
+        Matches precomputed by `precompute_matches` are served when, after dropping
+        attendees no longer in the index, they still cover `limit` (or, with
+        `diversity`, the larger re-ranking pool); otherwise they are scored on demand
+        from the in-memory index.
+        """
+
+        index = await self.get_index(event_id)
+        subject = index.get(attendee_id)
+        if subject is None:
+            return None
+
+        db = await get_database()
+        stored = await db.networking_matches.find_one({"event_id": event_id, "attendee_id": attendee_id})
+        pool = candidate_pool(limit, diversity)
+        candidates, scores, usable = [], [], False
+        if stored and pool <= stored.get("top_k", 0):
+            entries = stored.get("matches", [])
+            for entry in entries:
+                candidate = index.get(entry["id"])
+                if candidate is not None:
+                    candidates.append(candidate)
+                    scores.append(entry["score"])
+                    if len(candidates) == pool:
+                        break
+            # Short of `pool` only because the event had fewer attendees: still complete. Short
+            # because attendees left: the stored list no longer holds the top `pool`.
+            usable = len(candidates) == pool or len(candidates) == len(entries) < stored["top_k"]
+        if usable:
+            if diversity > 0 and candidates:
+                candidates, scores = await ai_executor.run(
+                    "networking_event",
+                    index.rerank,
+                    [candidate["id"] for candidate in candidates],
+                    scores,
+                    limit=limit,
+                    diversity=diversity,
+                )
+            return subject, [
+                build_match(subject, candidate, score, explain=explain)
+                for candidate, score in zip(candidates, scores)
+            ]
+
+        matches = await ai_executor.run(
+            "networking_event",
+            index.recommend,
+            attendee_id,
+            limit=limit,
+            diversity=diversity,
+            explain=explain,
+        )
+        return subject, matches or []
+
+    async def stream_recommendations(
+        self,
+        event_id: str,
+        limit: int = 3,
+        diversity: float = 0.0,
+        explain: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """Every indexed attendee's top matches as NDJSON, one attendee per line.
+
+        Rows are scored a block at a time on the AI executor, so memory stays bounded by
+        one block of the score matrix and the next block is only computed once the
+        client has taken the previous one. The whole stream reads one version of the
+        index, even if profiles change while it is being sent.
+        """
+
+        index = await self.get_index(event_id)
+        # A stale index rebuilds (and may embed) its matrix here, so keep it off the loop.
+        matrix = await ai_executor.run("networking_event", lambda: index.matrix)
+        block_size = matrix.block_size()
+        start, size = 0, min(_FIRST_STREAM_BLOCK, block_size)
+        while start < len(matrix):
+            stop = min(start + size, len(matrix))
+            yield await ai_executor.run(
+                "networking_event", _recommendation_lines, matrix, start, stop, limit, diversity, explain
+            )
+            start, size = stop, block_size
+
+    async def precompute_matches(
+        self,
+        event_id: str,
+        top_k: int = 20,
+        workers: Optional[int] = None,
+        block_size: Optional[int] = None,
+        restart: bool = False,
+    ) -> Dict[str, Any]:
+        """Store every attendee's top `top_k` matches in `networking_matches`.
+
+        The N×N scores are computed in row blocks across a process pool. Completed blocks
+        are recorded on the run document, so re-running with unchanged profiles resumes
+        where an interrupted run stopped; once a run has completed, a re-run starts afresh.
+        """
+
+        db = await get_database()
+        profiles = sorted(await self._load_profiles(event_id), key=lambda p: p["id"])
+        matrix = ProfileMatrix(profiles)
+        fingerprinted: Any = profiles
+        if self.semantic_weight > 0 and await asyncio.to_thread(rag_service.engine.wait_loaded):
+            vectors = await rag_service.engine.aembed([profile_text(profile) for profile in profiles])
+            if vectors is not None:
+                matrix = matrix.with_embeddings(vectors, self.semantic_weight)
+                fingerprinted = {"profiles": profiles, "semantic_weight": self.semantic_weight}
+        block_size = block_size or matrix.block_size()
+        total_blocks = -(-len(profiles) // block_size)
+        fingerprint = hashlib.sha1(
+            json.dumps(fingerprinted, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        run_key = {
+            "event_id": event_id,
+            "fingerprint": fingerprint,
+            "top_k": top_k,
+            "block_size": block_size,
+        }
+        if restart:
+            await db.networking_match_runs.delete_many({**run_key, "status": "running"})
+        run = await db.networking_match_runs.find_one_and_update(
+            {**run_key, "status": "running"},
+            {
+                "$setOnInsert": {
+                    "total_blocks": total_blocks,
+                    "completed_blocks": [],
+                    "started_at": datetime.utcnow(),
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        completed = set(run.get("completed_blocks", []))
+        pending = [block for block in range(total_blocks) if block not in completed]
+
+        rows = 0
+        started = time.perf_counter()
+        if pending:
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(matrix,),
+            ) as pool:
+                tasks = [
+                    loop.run_in_executor(
+                        pool,
+                        score_block,
+                        block,
+                        block * block_size,
+                        min((block + 1) * block_size, len(profiles)),
+                        top_k,
+                    )
+                    for block in pending
+                ]
+                for task in asyncio.as_completed(tasks):
+                    block, top_rows, top_scores = await task
+                    await self._store_block(
+                        db,
+                        event_id,
+                        run["_id"],
+                        top_k,
+                        profiles,
+                        block * block_size,
+                        top_rows,
+                        top_scores,
+                    )
+                    await db.networking_match_runs.update_one(
+                        {"_id": run["_id"]},
+                        {"$addToSet": {"completed_blocks": block}},
+                    )
+                    rows += len(top_rows)
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"networking matches {event_id}: block {block + 1}/{total_blocks}, "
+                        f"{rows / elapsed if elapsed else 0:.0f} rows/sec"
+                    )
+
+        elapsed = time.perf_counter() - started
+        rows_per_sec = rows / elapsed if elapsed else 0.0
+        await db.networking_match_runs.update_one(
+            {"_id": run["_id"]},
+            {"$set": {"status": "completed", "finished_at": datetime.utcnow(), "rows_per_sec": rows_per_sec}},
+        )
+        # Attendees who left the event since an earlier run keep no stale matches. Rows for
+        # current attendees are left alone even if a later run (another `top_k`) rewrote them.
+        await db.networking_matches.delete_many(
+            {
+                "event_id": event_id,
+                "run_id": {"$ne": run["_id"]},
+                "attendee_id": {"$nin": [profile["id"] for profile in profiles]},
+            }
+        )
+
+        return {
+            "event_id": event_id,
+            "attendees": len(profiles),
+            "blocks": total_blocks,
+            "resumed_blocks": len(completed),
+            "rows": rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows_per_sec, 1),
+        }
+
+    async def _store_block(
+        self,
+        db,
+        event_id: str,
+        run_id: ObjectId,
+        top_k: int,
+        profiles: List[Dict[str, Any]],
+        start: int,
+        top_rows: List[List[int]],
+        top_scores: List[List[float]],
+    ) -> None:
+        computed_at = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"event_id": event_id, "attendee_id": profiles[start + offset]["id"]},
+                {
+                    "$set": {
+                        "matches": [
+                            {"id": profiles[row]["id"], "score": score}
+                            for row, score in zip(rows, scores)
+                        ],
+                        "top_k": top_k,
+                        "run_id": run_id,
+                        "computed_at": computed_at,
+                    }
+                },
+                upsert=True,
+            )
+            for offset, (rows, scores) in enumerate(zip(top_rows, top_scores))
+        ]
+        if operations:
+            await db.networking_matches.bulk_write(operations, ordered=False)
+
+    async def refresh_user(self, user_id: str) -> None:
+        """Re-read a user's profile into every loaded index they belong to."""
+
+        indexed = [event_id for event_id, index in self._indexes.items() if user_id in index]
+        if not indexed:
+            return
+
+        db = await get_database()
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, _USER_FIELDS)
+        registrations = await db.registrations.find(
+            {
+                "user_id": user_id,
+                "event_id": {"$in": indexed},
+                "status": RegistrationStatus.CONFIRMED,
+            }
+        ).to_list(None)
+
+        for registration in registrations:
+            index = self._indexes.get(registration["event_id"])
+            if index is not None:
+                index.upsert(build_profile(registration, user))
+
+    async def add_registration(self, registration: Dict[str, Any]) -> None:
+        """Add a newly confirmed registration to its event's index, if that index is loaded."""
+
+        index = self._indexes.get(registration["event_id"])
+        if index is None:
+            return
+
+        user = None
+        user_id = registration.get("user_id")
+        if user_id and ObjectId.is_valid(user_id):
+            db = await get_database()
+            user = await db.users.find_one({"_id": ObjectId(user_id)}, _USER_FIELDS)
+        index.upsert(build_profile(registration, user))
+
+    async def _load_profiles(self, event_id: str) -> List[Dict[str, Any]]:
+        db = await get_database()
+        registrations = await db.registrations.find(
+            {"event_id": event_id, "status": RegistrationStatus.CONFIRMED},
+            {"qr_code_image": 0},
+        ).to_list(None)
+
+        user_ids = {
+            ObjectId(r["user_id"])
+            for r in registrations
+            if r.get("user_id") and ObjectId.is_valid(r["user_id"])
+        }
+        users: Dict[str, Dict[str, Any]] = {}
+        if user_ids:
+            async for user in db.users.find({"_id": {"$in": list(user_ids)}}, _USER_FIELDS):
+                users[str(user["_id"])] = user
+
+        return [build_profile(r, users.get(str(r.get("user_id")))) for r in registrations]
+
+
+networking_service = NetworkingService()
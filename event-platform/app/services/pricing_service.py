@@ -1,11 +1,11 @@
 from datetime import datetime
 from typing import Optional
 
-from bson import ObjectId
-
 from app.database import get_database
 from app.models.discount_code import DiscountCode, DiscountType
 from app.models.ticket import TicketType
+from app.services.metadata_cache import RequestLoader
+from app.services.ticket_counter_service import ticket_counter_service
 
 
 class PricingService:
@@ -14,9 +14,11 @@ class PricingService:
         ticket_type_id: str,
         quantity: int = 1,
         discount_code: Optional[str] = None,
+        loader: Optional[RequestLoader] = None,
     ) -> dict:
-        db = await get_database()
-        ticket_data = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+        loader = loader or RequestLoader()
+        # Early-bird pricing depends on early_bird_sold, so this needs the live document.
+        ticket_data = await loader.ticket_type(ticket_type_id, counters=True)
         if not ticket_data:
             raise ValueError("Ticket type not found")
 
@@ -145,13 +147,21 @@ class PricingService:
             "discount_amount": discount_amount,
         }
 
-    async def check_availability(self, ticket_type_id: str, quantity: int = 1) -> dict:
-        db = await get_database()
-        ticket_data = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+    async def check_availability(
+        self,
+        ticket_type_id: str,
+        quantity: int = 1,
+        loader: Optional[RequestLoader] = None,
+    ) -> dict:
+        loader = loader or RequestLoader()
+        ticket_data = await loader.ticket_type(ticket_type_id, counters=True)
 
         if not ticket_data:
             raise ValueError("Ticket type not found")
 
+        if ticket_data.get("counter_shards", 0) > 1:
+            totals = await ticket_counter_service.totals([ticket_type_id])
+            ticket_data = {**ticket_data, **totals.get(ticket_type_id, {})}
         ticket = TicketType(**ticket_data)
 
         if not ticket.is_active:
@@ -0,0 +1,295 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from bson import ObjectId
+
+from app.ai.rag import RagEngine, ShardedRagIndex
+from app.config import settings
+from app.database import get_database
+
+from .ai_executor import ai_executor
+
+
+class RagService:
+    """Owns the RAG engine and an in-memory snapshot of MongoDB with its document index.
+
+    Chat requests read the cached snapshot. It is rebuilt when older than
+    `rag_snapshot_ttl_seconds` or after `invalidate()`, which is called on writes that
+    change what the assistant knows (new events, profile updates).
+    Once a snapshot exists, a stale one keeps being served while a single background
+    rebuild runs, so chat traffic never queues on MongoDB.
+
+    The index is sharded per source and event. `invalidate_event()` rebuilds only that
+    event's shards (its event document and the attendees registered through it); the
+    platform-wide FAQ figures, `snapshot()` and the full index unfiltered queries use
+    catch up on the next full rebuild (until then those queries merge the shards).
+    """
+
+    def __init__(self) -> None:
+        self.engine = RagEngine(
+            cache_size=settings.rag_embedding_cache_size,
+            cache_path=settings.rag_embedding_cache_path,
+            backend=settings.rag_backend,
+            mode=settings.rag_retrieval_mode,
+            ann_min_documents=settings.rag_ann_min_documents,
+            ann_nprobe=settings.rag_ann_nprobe,
+            encode_batch_size=settings.rag_encode_batch_size,
+            encode_max_wait_ms=settings.rag_encode_max_wait_ms,
+            executor=ai_executor,
+        )
+        self.ttl = settings.rag_snapshot_ttl_seconds
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._index: Optional[ShardedRagIndex] = None
+        self._dirty_events: Set[str] = set()
+        self._version = 0
+        self._built_version = -1
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    def invalidate_event(self, event_id: str) -> None:
+        self._dirty_events.add(event_id)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        await self._ensure_fresh()
+        return self._snapshot
+
+    async def index(self) -> ShardedRagIndex:
+        await self._ensure_fresh()
+        return self._index
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and self._built_version == self._version
+            and time.monotonic() - self._built_at < self.ttl
+        )
+
+    async def _ensure_fresh(self) -> None:
+        if self._is_fresh() and not self._dirty_events:
+            return
+        if self._snapshot is None:
+            await self._refresh()
+        elif self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            dirty = set(self._dirty_events)
+            if self._is_fresh():
+                for event_id in dirty:
+                    # replace_event drops the `full` index anyway; building one here is wasted work.
+                    shards = await self.engine.abuild_sharded(await self.build_event_snapshot(event_id), full=False)
+                    self._index = self._index.replace_event(event_id, shards)
+                self._dirty_events -= dirty
+                return
+            version = self._version
+            snapshot = await self.build_snapshot()
+            self._index = await self.engine.abuild_sharded(snapshot)
+            self._snapshot = snapshot
+            self._built_version = version
+            self._built_at = time.monotonic()
+            self._dirty_events -= dirty
+
+    async def build_snapshot(self) -> Dict[str, Any]:
+        """Build a comprehensive snapshot from MongoDB for RAG context.
+
+        Pulls events, users (attendees), registrations, and injects rich FAQ data
+        so the chatbot can answer questions about the platform, events, attendees,
+        networking, and logistics.
+        """
+
+        db = await get_database()
+
+        # ── Events ────────────────────────────────────────────────────────────
+        events_raw = await db.events.find({}).sort("start_date", 1).to_list(200)
+        events = [_snapshot_event(e) for e in events_raw]
+
+        # ── Attendees from users collection ───────────────────────────────────
+        users_raw = await db.users.find({}).to_list(500)
+        seen_attendees: set[str] = set()
+        attendees = []
+        for u in users_raw:
+            uid = str(u.get("_id"))
+            if uid in seen_attendees:
+                continue
+            seen_attendees.add(uid)
+            attendees.append(
+                {
+                    "id": uid,
+                    "name": u.get("name", "Unknown"),
+                    "email": u.get("email"),
+                    "company": u.get("company"),
+                    "industry": u.get("industry"),
+                    "role": u.get("role", "ATTENDEE"),
+                    "interests": u.get("interests", []),
+                }
+            )
+
+        # ── Also pull from registrations (legacy) ─────────────────────────────
+        # Guests without a user account are indexed once per event they registered for.
+        registrations_raw = await db.registrations.find({}).sort("created_at", -1).to_list(500)
+        attendees.extend(_registration_attendees(registrations_raw, seen_attendees))
+
+        # ── Rich FAQ ──────────────────────────────────────────────────────────
+        total_events = len(events)
+        total_attendees = len({a["id"] for a in attendees})
+        total_capacity = sum(e.get("capacity", 0) for e in events)
+        total_registrations = sum(e.get("registeredCount", 0) for e in events)
+        event_names = ", ".join(e.get("name", "Untitled") for e in events[:10]) or "No events yet"
+        event_locations = ", ".join(set(e.get("location", "") for e in events if e.get("location"))) or "No locations set"
+
+        faq = [
+            {
+                "question": "Where can I find event schedules and venue information?",
+                "answer": "Use the Dashboard for event summaries and the Venue Editor for layout details. For live sessions, check the Event Hub.",
+                "category": "logistics",
+                "audience": "attendee",
+            },
+            {
+                "question": "How many events are there? What events do we have?",
+                "answer": f"There are currently {total_events} events on the platform: {event_names}.",
+                "category": "overview",
+                "audience": "all",
+            },
+            {
+                "question": "How many attendees or users are registered?",
+                "answer": f"There are {total_attendees} registered users on the platform, with {total_registrations} total event registrations across {total_events} events.",
+                "category": "overview",
+                "audience": "organizer",
+            },
+            {
+                "question": "What is the total capacity across all events?",
+                "answer": f"The combined capacity across all events is {total_capacity} seats.",
+                "category": "overview",
+                "audience": "organizer",
+            },
+            {
+                "question": "Where are the events located? What are the event locations?",
+                "answer": f"Events are located at: {event_locations}.",
+                "category": "logistics",
+                "audience": "attendee",
+            },
+            {
+                "question": "How does AI networking work?",
+                "answer": "The AI Networking feature uses weighted-similarity matching based on your interests, industry, and company to recommend the best people to connect with at events. Update your profile interests to get better matches.",
+                "category": "feature",
+                "audience": "attendee",
+            },
+            {
+                "question": "How do I update my profile or interests?",
+                "answer": "Go to the 'My Profile' section from the sidebar or click your avatar in the top-right. You can update your name, company, industry, phone, and interests there. Interests directly affect AI networking recommendations.",
+                "category": "feature",
+                "audience": "attendee",
+            },
+            {
+                "question": "What features does EventNexus offer?",
+                "answer": "EventNexus offers: Dashboard analytics, Event creation & management, AI Networking (smart attendee matching), RAG-powered AI Assistant, Venue Editor (interactive floor plans), Badge generation, Session management with live polls, Q&A, and real-time engagement tracking.",
+                "category": "feature",
+                "audience": "all",
+            },
+            {
+                "question": "How do I create a new event?",
+                "answer": "As an organizer, go to the Dashboard and click 'Create New Event'. Fill in the name, date, location, capacity, and description. The event will be saved to MongoDB and visible on the platform immediately.",
+                "category": "feature",
+                "audience": "organizer",
+            },
+            {
+                "question": "What technology stack does this platform use?",
+                "answer": "The backend uses FastAPI (Python) with MongoDB Atlas for the database. Authentication uses JWT tokens with bcrypt password hashing. The frontend is React 19 with TypeScript, Vite, and TailwindCSS. AI features use sentence-transformers for semantic search and BM25 keyword search as a fallback.",
+                "category": "technical",
+                "audience": "all",
+            },
+            {
+                "question": "How do I register for an event?",
+                "answer": "Navigate to the Events section, find the event you want to attend, and click Register. You'll receive a QR code ticket for check-in.",
+                "category": "logistics",
+                "audience": "attendee",
+            },
+            {
+                "question": "Who are the attendees? List the registered users.",
+                "answer": f"There are {total_attendees} registered users. " + (
+                    "Some attendees include: " + ", ".join(
+                        f"{a.get('name', 'Unknown')} ({a.get('company') or 'no company'})"
+                        for a in attendees[:8]
+                    ) + "." if attendees else "No attendees registered yet."
+                ),
+                "category": "networking",
+                "audience": "all",
+            },
+        ]
+
+        return {"events": events, "sessions": [], "attendees": attendees, "faq": faq}
+
+    async def build_event_snapshot(self, event_id: str) -> Dict[str, Any]:
+        """The part of `build_snapshot` that belongs to one event's shards."""
+
+        db = await get_database()
+        event = await db.events.find_one({"_id": ObjectId(event_id)}) if ObjectId.is_valid(event_id) else None
+        events = [_snapshot_event(event)] if event is not None else []
+
+        registrations_raw = await db.registrations.find({"event_id": event_id}).sort("created_at", -1).to_list(500)
+        user_ids = [
+            ObjectId(r["user_id"]) for r in registrations_raw if r.get("user_id") and ObjectId.is_valid(r["user_id"])
+        ]
+        users = await db.users.find({"_id": {"$in": user_ids}}, {"_id": 1}).to_list(len(user_ids) or 1)
+        seen_attendees = {str(u["_id"]) for u in users}
+        attendees = _registration_attendees(registrations_raw, seen_attendees)
+        return {"events": events, "sessions": [], "attendees": attendees, "faq": []}
+
+
+def _snapshot_event(e: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(e.get("_id")),
+        "name": e.get("name"),
+        "description": e.get("description"),
+        "startDate": (e.get("start_date").isoformat() if e.get("start_date") else None),
+        "endDate": (e.get("end_date").isoformat() if e.get("end_date") else None),
+        "location": e.get("location"),
+        "organizerId": e.get("organizer_id"),
+        "capacity": e.get("capacity"),
+        "registeredCount": e.get("registered_count", 0),
+        "status": (str(e.get("status")) if e.get("status") is not None else "draft"),
+        "revenue": e.get("revenue", 0),
+    }
+
+
+def _registration_attendees(registrations: List[Dict[str, Any]], seen_attendees: Set[str]) -> List[Dict[str, Any]]:
+    attendees = []
+    seen_registrations: Set[tuple] = set()
+    for r in registrations:
+        form_responses = r.get("form_responses")
+        interests: list[str] = []
+        if isinstance(form_responses, dict):
+            raw_interests = form_responses.get("interests")
+            if isinstance(raw_interests, list):
+                interests = [str(x) for x in raw_interests if x]
+            elif isinstance(raw_interests, str):
+                interests = [s.strip() for s in raw_interests.split(",") if s.strip()]
+
+        attendee_id = str(r.get("user_id") or r.get("_id"))
+        key = (attendee_id, r.get("event_id"))
+        if attendee_id in seen_attendees or key in seen_registrations:
+            continue
+        seen_registrations.add(key)
+        name = " ".join([r.get("first_name") or "", r.get("last_name") or ""]).strip() or "Attendee"
+        attendees.append(
+            {
+                "id": attendee_id,
+                "eventId": r.get("event_id"),
+                "name": name,
+                "email": r.get("email"),
+                "company": r.get("company"),
+                "industry": None,
+                "role": r.get("job_title"),
+                "interests": interests,
+            }
+        )
+    return attendees
+
+
+rag_service = RagService()
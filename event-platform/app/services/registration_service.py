@@ -1,15 +1,28 @@
+import asyncio
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
 
 from app.config import settings
 from app.database import get_database
-from app.models.registration import PaymentStatus, Registration, RegistrationStatus
+from app.models.registration import PaymentConfirmation, PaymentStatus, Registration, RegistrationStatus
 from app.models.waitlist import WaitlistEntry
 from app.services.email_service import email_service
+from app.services.inventory_service import inventory_service
+from app.services.metadata_cache import RequestLoader
+from app.services.networking_service import networking_service
 from app.services.pricing_service import pricing_service
 from app.services.qrcode_service import qrcode_service
+from app.services.rag_service import rag_service
+
+
+def _split_evenly(amount: float, parts: int) -> List[float]:
+    """`amount` in `parts` whole-cent shares that add up to it; leftover cents go to the first shares."""
+
+    share, remainder = divmod(round(amount * 100), parts)
+    return [(share + 1) / 100 if part < remainder else share / 100 for part in range(parts)]
 
 
 class RegistrationService:
@@ -19,11 +32,10 @@ class RegistrationService:
         user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         db = await get_database()
+        loader = RequestLoader()
+        quantity = registration_data.get("group_size", 1)
 
-        availability = await pricing_service.check_availability(
-            registration_data["ticket_type_id"],
-            registration_data.get("group_size", 1),
-        )
+        availability = await inventory_service.reserve(registration_data["ticket_type_id"], quantity, loader)
 
         if not availability["available"]:
             if availability.get("waitlist_available"):
@@ -40,52 +52,58 @@ class RegistrationService:
                 "waitlist": False,
             }
 
-        pricing = await pricing_service.calculate_price(
-            registration_data["ticket_type_id"],
-            registration_data.get("group_size", 1),
-            registration_data.get("discount_code"),
-        )
+        try:
+            pricing = await pricing_service.calculate_price(
+                registration_data["ticket_type_id"],
+                quantity,
+                registration_data.get("discount_code"),
+                loader,
+            )
 
-        temp_id = str(ObjectId())
-        qr_code, qr_code_image = qrcode_service.generate_qr_code(temp_id)
+            temp_id = str(ObjectId())
+            qr_code, qr_code_image = qrcode_service.generate_qr_code(temp_id)
+
+            registration = Registration(
+                event_id=registration_data["event_id"],
+                user_id=user_id,
+                ticket_type_id=registration_data["ticket_type_id"],
+                first_name=registration_data["first_name"],
+                last_name=registration_data["last_name"],
+                email=registration_data["email"],
+                phone=registration_data.get("phone"),
+                company=registration_data.get("company"),
+                job_title=registration_data.get("job_title"),
+                form_responses=registration_data.get("form_responses"),
+                group_size=quantity,
+                counter_shard=availability.get("counter_shard"),
+                original_price=pricing["subtotal"],
+                discount_amount=pricing["total_discount"],
+                final_price=pricing["final_price"],
+                payment_required=pricing["final_price"] > 0,
+                discount_code=registration_data.get("discount_code"),
+                qr_code=qr_code,
+                qr_code_image=qr_code_image,
+                status=RegistrationStatus.PENDING,
+                payment_status=PaymentStatus.PENDING,
+                discount_details=pricing.get("discount_details"),
+            )
 
-        registration = Registration(
-            event_id=registration_data["event_id"],
-            user_id=user_id,
-            ticket_type_id=registration_data["ticket_type_id"],
-            first_name=registration_data["first_name"],
-            last_name=registration_data["last_name"],
-            email=registration_data["email"],
-            phone=registration_data.get("phone"),
-            company=registration_data.get("company"),
-            job_title=registration_data.get("job_title"),
-            form_responses=registration_data.get("form_responses"),
-            group_size=registration_data.get("group_size", 1),
-            original_price=pricing["subtotal"],
-            discount_amount=pricing["total_discount"],
-            final_price=pricing["final_price"],
-            discount_code=registration_data.get("discount_code"),
-            qr_code=qr_code,
-            qr_code_image=qr_code_image,
-            status=RegistrationStatus.PENDING,
-            payment_status=PaymentStatus.PENDING,
-            discount_details=pricing.get("discount_details"),
-        )
+            result = await db.registrations.insert_one(
+                registration.model_dump(by_alias=True, exclude={"id"})
+            )
+        except Exception:
+            await inventory_service.release(
+                registration_data["ticket_type_id"],
+                quantity,
+                availability.get("counter_shard"),
+            )
+            raise
 
-        result = await db.registrations.insert_one(
-            registration.model_dump(by_alias=True, exclude={"id"})
-        )
         registration_id = str(result.inserted_id)
+        rag_service.invalidate_event(registration_data["event_id"])
 
-        await db.ticket_types.update_one(
-            {"_id": ObjectId(registration_data["ticket_type_id"])},
-            {"$inc": {"reserved": registration_data.get("group_size", 1)}},
-        )
-
-        event = await db.events.find_one({"_id": ObjectId(registration_data["event_id"])})
-        ticket_type = await db.ticket_types.find_one(
-            {"_id": ObjectId(registration_data["ticket_type_id"])}
-        )
+        event = await loader.event(registration_data["event_id"])
+        ticket_type = availability["ticket"]
 
         return {
             "success": True,
@@ -98,11 +116,126 @@ class RegistrationService:
             "ticket_type_name": ticket_type.get("name") if ticket_type else "",
         }
 
+    async def create_bulk_registration(
+        self,
+        bulk_data: Dict[str, Any],
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Register several attendees as one group order.
+
+        The whole group is reserved and priced once (so group discounts apply), QR codes
+        are generated in parallel and the registrations are inserted with one
+        ``insert_many``, linked by `group_id` with the first attendee as group lead.
+        Paying for the lead confirms the whole group.
+        """
+
+        db = await get_database()
+        loader = RequestLoader()
+        attendees = bulk_data["attendees"]
+        ticket_type_id = bulk_data["ticket_type_id"]
+        quantity = len(attendees)
+
+        availability = await inventory_service.reserve(ticket_type_id, quantity, loader)
+        if not availability["available"]:
+            return {
+                "success": False,
+                "reason": availability["reason"],
+                "available_quantity": availability.get("available_quantity"),
+            }
+
+        group_id = str(ObjectId())
+        try:
+            pricing = await pricing_service.calculate_price(
+                ticket_type_id,
+                quantity,
+                bulk_data.get("discount_code"),
+                loader,
+            )
+            codes = await asyncio.gather(
+                *(asyncio.to_thread(qrcode_service.generate_qr_code, str(ObjectId())) for _ in attendees)
+            )
+
+            original_prices = _split_evenly(pricing["subtotal"], quantity)
+            discounts = _split_evenly(pricing["total_discount"], quantity)
+            final_prices = _split_evenly(pricing["final_price"], quantity)
+
+            registrations = []
+            for position, attendee in enumerate(attendees):
+                qr_code, qr_code_image = codes[position]
+                registrations.append(
+                    Registration(
+                        event_id=bulk_data["event_id"],
+                        user_id=user_id if position == 0 else None,
+                        ticket_type_id=ticket_type_id,
+                        first_name=attendee["first_name"],
+                        last_name=attendee["last_name"],
+                        email=attendee["email"],
+                        phone=attendee.get("phone"),
+                        company=attendee.get("company"),
+                        job_title=attendee.get("job_title"),
+                        form_responses=attendee.get("form_responses"),
+                        is_group_lead=position == 0,
+                        group_id=group_id,
+                        group_size=1,
+                        counter_shard=availability.get("counter_shard"),
+                        original_price=original_prices[position],
+                        discount_amount=discounts[position],
+                        final_price=final_prices[position],
+                        payment_required=pricing["final_price"] > 0,
+                        discount_code=bulk_data.get("discount_code"),
+                        qr_code=qr_code,
+                        qr_code_image=qr_code_image,
+                        status=RegistrationStatus.PENDING,
+                        payment_status=PaymentStatus.PENDING,
+                        discount_details=pricing.get("discount_details"),
+                    )
+                )
+
+            result = await db.registrations.insert_many(
+                [registration.model_dump(by_alias=True, exclude={"id"}) for registration in registrations]
+            )
+        except Exception:
+            # An ordered insert_many may have written a prefix of the group before failing.
+            await db.registrations.delete_many({"group_id": group_id})
+            await inventory_service.release(ticket_type_id, quantity, availability.get("counter_shard"))
+            raise
+
+        rag_service.invalidate_event(bulk_data["event_id"])
+        event = await loader.event(bulk_data["event_id"])
+
+        return {
+            "success": True,
+            "group_id": group_id,
+            "lead_registration_id": str(result.inserted_ids[0]),
+            "registrations": [
+                {
+                    "registration_id": str(registration_id),
+                    "email": registration.email,
+                    "is_group_lead": registration.is_group_lead,
+                    "final_price": registration.final_price,
+                    "qr_code": registration.qr_code,
+                    "qr_code_image": registration.qr_code_image,
+                }
+                for registration_id, registration in zip(result.inserted_ids, registrations)
+            ],
+            "pricing": pricing,
+            "payment_required": pricing["final_price"] > 0,
+            "event_name": event.get("name") if event else "",
+            "ticket_type_name": availability["ticket"].get("name", ""),
+        }
+
     async def confirm_payment(
         self,
         registration_id: str,
         payment_data: Dict[str, Any],
-    ) -> bool:
+    ) -> PaymentConfirmation:
+        """Confirm a paid registration (and, for a group lead, the rest of the group).
+
+        A registration whose hold expired before the payment arrived gets its seats
+        reserved again; if they are gone it is flagged ``refund_required`` and
+        `PaymentConfirmation.SOLD_OUT` is returned, so the caller can refund it.
+        """
+
         db = await get_database()
 
         update_data = {
@@ -116,39 +249,139 @@ class RegistrationService:
             "updated_at": datetime.utcnow(),
         }
 
+        # Only a pending registration still holds its seats; an expired one gave them back.
         result = await db.registrations.update_one(
-            {"_id": ObjectId(registration_id)},
+            {"_id": ObjectId(registration_id), "status": RegistrationStatus.PENDING},
             {"$set": update_data},
         )
 
         if result.modified_count == 0:
-            return False
+            outcome = await self._confirm_expired(registration_id, update_data)
+            if outcome is not PaymentConfirmation.CONFIRMED:
+                return outcome
 
         registration = await db.registrations.find_one({"_id": ObjectId(registration_id)})
-
-        await db.ticket_types.update_one(
-            {"_id": ObjectId(registration["ticket_type_id"])},
-            {
-                "$inc": {
-                    "reserved": -registration["group_size"],
-                    "sold_count": registration["group_size"],
+        confirmed = [registration]
+        if registration.get("is_group_lead") and registration.get("group_id"):
+            # The lead's payment covers the rest of a bulk order. Members that are no longer
+            # pending (paid on their own, or expired) are left alone.
+            await db.registrations.update_many(
+                {"group_id": registration["group_id"], "is_group_lead": False, "status": RegistrationStatus.PENDING},
+                {"$set": {**update_data, "paid_by_registration_id": registration_id}},
+            )
+            confirmed += await db.registrations.find(
+                {
+                    "group_id": registration["group_id"],
+                    "paid_by_registration_id": registration_id,
+                    "status": RegistrationStatus.CONFIRMED,
                 }
-            },
-        )
+            ).to_list(None)
 
-        ticket_type = await db.ticket_types.find_one(
-            {"_id": ObjectId(registration["ticket_type_id"])}
-        )
+        for member in confirmed:
+            await networking_service.add_registration(member)
+
+        # Members re-reserved after expiring may hold their seats on another counter shard.
+        shards = Counter()
+        for member in confirmed:
+            shards[member.get("counter_shard")] += member["group_size"]
+        for shard, seats in shards.items():
+            await inventory_service.confirm(registration["ticket_type_id"], seats, shard)
+        quantity = sum(shards.values())
+
+        loader = RequestLoader()
+        ticket_type = await loader.ticket_type(registration["ticket_type_id"])
         if ticket_type.get("is_early_bird") and ticket_type.get("early_bird_capacity"):
             pricing_details = registration.get("discount_details", {})
             if "early_bird" in pricing_details:
                 await db.ticket_types.update_one(
                     {"_id": ObjectId(registration["ticket_type_id"])},
-                    {"$inc": {"early_bird_sold": registration["group_size"]}},
+                    {"$inc": {"early_bird_sold": quantity}},
                 )
 
-        event = await db.events.find_one({"_id": ObjectId(registration["event_id"])})
-        ticket = ticket_type or {}
+        event = await loader.event(registration["event_id"])
+        for member in confirmed:
+            await self._send_confirmation(member, event or {}, ticket_type or {})
+
+        return PaymentConfirmation.CONFIRMED
+
+    async def _confirm_expired(self, registration_id: str, update_data: Dict[str, Any]) -> PaymentConfirmation:
+        """Reserve the seats of an expired registration again and mark it confirmed.
+
+        A group lead takes its expired members along. The caller finishes the
+        confirmation as for a pending registration.
+        """
+
+        db = await get_database()
+        registration = await db.registrations.find_one({"_id": ObjectId(registration_id)}, {"qr_code_image": 0})
+        if registration is None or registration["status"] != RegistrationStatus.EXPIRED:
+            return PaymentConfirmation.NOT_PENDING
+
+        members = []
+        if registration.get("is_group_lead") and registration.get("group_id"):
+            members = await db.registrations.find(
+                {"group_id": registration["group_id"], "is_group_lead": False, "status": RegistrationStatus.EXPIRED},
+                {"_id": 1, "group_size": 1},
+            ).to_list(None)
+        quantity = registration["group_size"] + sum(member["group_size"] for member in members)
+
+        ticket_type_id = registration["ticket_type_id"]
+        availability = await inventory_service.reserve(ticket_type_id, quantity, RequestLoader())
+        if not availability["available"]:
+            payment = {key: value for key, value in update_data.items() if key != "status"}
+            await db.registrations.update_one(
+                {"_id": registration["_id"], "status": RegistrationStatus.EXPIRED},
+                {"$set": {**payment, "refund_required": True}},
+            )
+            return PaymentConfirmation.SOLD_OUT
+
+        shard = availability.get("counter_shard")
+        claimed = await db.registrations.update_one(
+            {"_id": registration["_id"], "status": RegistrationStatus.EXPIRED},
+            {"$set": {**update_data, "counter_shard": shard}},
+        )
+        if not claimed.modified_count:
+            # Another confirmation of the same payment got there first.
+            await inventory_service.release(ticket_type_id, quantity, shard)
+            return PaymentConfirmation.NOT_PENDING
+
+        if members:
+            await db.registrations.update_many(
+                {"_id": {"$in": [member["_id"] for member in members]}, "status": RegistrationStatus.EXPIRED},
+                {"$set": {**update_data, "counter_shard": shard, "paid_by_registration_id": registration_id}},
+            )
+            taken = await db.registrations.find(
+                {"_id": {"$in": [member["_id"] for member in members]}, "paid_by_registration_id": registration_id},
+                {"group_size": 1},
+            ).to_list(None)
+            unclaimed = quantity - registration["group_size"] - sum(member["group_size"] for member in taken)
+            if unclaimed:
+                await inventory_service.release(ticket_type_id, unclaimed, shard)
+        return PaymentConfirmation.CONFIRMED
+
+    async def record_refund(self, registration_id: str, refund: Dict[str, Any]) -> None:
+        """Mark a `refund_required` registration as refunded."""
+
+        db = await get_database()
+        await db.registrations.update_one(
+            {"_id": ObjectId(registration_id)},
+            {
+                "$set": {
+                    "payment_status": PaymentStatus.REFUNDED,
+                    "refund_required": False,
+                    "refund_id": refund.get("refund_id"),
+                    "updated_at": datetime.utcnow(),
+                }
+            },
+        )
+
+    async def _send_confirmation(
+        self,
+        registration: Dict[str, Any],
+        event: Dict[str, Any],
+        ticket: Dict[str, Any],
+    ) -> None:
+        db = await get_database()
+        registration_id = str(registration["_id"])
 
         email_data = {
             "first_name": registration["first_name"],
@@ -184,8 +417,6 @@ class RegistrationService:
                 },
             )
 
-        return True
-
     async def _add_to_waitlist(self, registration_data: Dict[str, Any]) -> Dict[str, Any]:
         db = await get_database()
         count = await db.waitlist_entries.count_documents(
@@ -215,7 +446,8 @@ class RegistrationService:
 
     async def process_waitlist(self, event_id: str, ticket_type_id: str) -> None:
         db = await get_database()
-        availability = await pricing_service.check_availability(ticket_type_id, 1)
+        loader = RequestLoader()
+        availability = await pricing_service.check_availability(ticket_type_id, 1, loader)
         if not availability["available"]:
             return
 
@@ -232,8 +464,8 @@ class RegistrationService:
         if not waitlist_entry:
             return
 
-        event = await db.events.find_one({"_id": ObjectId(event_id)})
-        ticket_type = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+        event = await loader.event(event_id)
+        ticket_type = await loader.ticket_type(ticket_type_id)
 
         await email_service.send_waitlist_notification(
             waitlist_entry["email"],
@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import get_database
+from app.models.registration import RegistrationStatus
+from app.services.registration_service import registration_service
+
+# Sweep ids remembered on each released counter, so a retried release is not applied twice.
+RELEASED_SWEEPS_KEPT = 100
+# A batch still marked `releasing` after this long was abandoned (e.g. the process died).
+RELEASE_RETRY_AFTER = timedelta(minutes=5)
+
+
+class RegistrationSweeper:
+    """Expires abandoned checkouts and gives their reserved seats back.
+
+    Every `registration_sweep_interval_seconds` the sweeper looks for PENDING
+    registrations that need payment and are older than `registration_hold_minutes`
+    (on the ``(status, payment_required, created_at)`` index), in batches of
+    `registration_sweep_batch_size`:
+
+    - one ``update_many`` marks a batch EXPIRED, ``releasing`` and tagged with the
+      sweep id, only where the registration is still PENDING, so a payment confirmed
+      meanwhile wins;
+    - the tagged registrations are summed per ticket type (and counter shard) and the
+      seats released with one ``bulk_write`` per counter collection, then
+      ``releasing`` is unset;
+    - `process_waitlist` runs once per affected ticket type.
+
+    A batch left ``releasing`` (the process stopped mid-sweep) is released again by a
+    later sweep. Each counter update records its sweep id in ``released_sweeps`` and
+    skips counters that already have it, so seats are given back exactly once.
+    """
+
+    def __init__(self) -> None:
+        self.hold = timedelta(minutes=settings.registration_hold_minutes)
+        self.interval = settings.registration_sweep_interval_seconds
+        self.batch_size = settings.registration_sweep_batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                stats = await self.sweep()
+                if stats["expired"]:
+                    print(
+                        f"Expired {stats['expired']} registrations, released {stats['seats']} seats "
+                        f"across {stats['ticket_types']} ticket types"
+                    )
+            except Exception as exc:
+                print(f"Warning: registration sweep failed: {exc}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> Dict[str, int]:
+        """Finish releases an earlier sweep abandoned, then expire every overdue unpaid registration."""
+
+        totals = {"expired": 0, "seats": 0, "ticket_types": 0}
+        waitlists: set[tuple[str, str]] = set()
+        for seats, ticket_types in await self._retry_releases():
+            totals["seats"] += seats
+            waitlists.update(ticket_types)
+        while True:
+            expired, seats, ticket_types = await self._sweep_batch()
+            totals["expired"] += expired
+            totals["seats"] += seats
+            waitlists.update(ticket_types)
+            if expired < self.batch_size:
+                break
+
+        for event_id, ticket_type_id in waitlists:
+            await registration_service.process_waitlist(event_id, ticket_type_id)
+        totals["ticket_types"] = len(waitlists)
+        return totals
+
+    async def _sweep_batch(self) -> tuple[int, int, List[tuple[str, str]]]:
+        db = await get_database()
+        now = datetime.utcnow()
+        overdue = await db.registrations.find(
+            {
+                "status": RegistrationStatus.PENDING,
+                "payment_required": True,
+                "created_at": {"$lt": now - self.hold},
+            },
+            {"_id": 1},
+        ).limit(self.batch_size).to_list(self.batch_size)
+        if not overdue:
+            return 0, 0, []
+
+        sweep_id = str(ObjectId())
+        result = await db.registrations.update_many(
+            {"_id": {"$in": [r["_id"] for r in overdue]}, "status": RegistrationStatus.PENDING},
+            {
+                "$set": {
+                    "status": RegistrationStatus.EXPIRED,
+                    "sweep_id": sweep_id,
+                    "releasing": True,
+                    "expired_at": now,
+                    "updated_at": now,
+                }
+            },
+        )
+        if not result.modified_count:
+            return 0, 0, []
+
+        seats, ticket_types = await self._release_sweep(sweep_id)
+        return result.modified_count, seats, ticket_types
+
+    async def _retry_releases(self) -> List[tuple[int, List[tuple[str, str]]]]:
+        """Release the seats of batches an earlier sweep expired but never released."""
+
+        db = await get_database()
+        abandoned = await db.registrations.distinct(
+            "sweep_id",
+            {"releasing": True, "expired_at": {"$lt": datetime.utcnow() - RELEASE_RETRY_AFTER}},
+        )
+        return [await self._release_sweep(sweep_id) for sweep_id in abandoned]
+
+    async def _release_sweep(self, sweep_id: str) -> tuple[int, List[tuple[str, str]]]:
+        db = await get_database()
+        groups = await db.registrations.aggregate(
+            [
+                {"$match": {"sweep_id": sweep_id}},
+                {
+                    "$group": {
+                        "_id": {
+                            "event_id": "$event_id",
+                            "ticket_type_id": "$ticket_type_id",
+                            "counter_shard": "$counter_shard",
+                        },
+                        "seats": {"$sum": "$group_size"},
+                    }
+                },
+            ]
+        ).to_list(None)
+        await self._release(sweep_id, groups)
+        await db.registrations.update_many({"sweep_id": sweep_id}, {"$unset": {"releasing": ""}})
+
+        seats = sum(group["seats"] for group in groups)
+        ticket_types = list({(g["_id"]["event_id"], g["_id"]["ticket_type_id"]) for g in groups})
+        return seats, ticket_types
+
+    async def _release(self, sweep_id: str, groups: List[Dict[str, Any]]) -> None:
+        db = await get_database()
+        ticket_types, counters = [], []
+        for group in groups:
+            key, seats = group["_id"], group["seats"]
+            update = {
+                "$inc": {"reserved": -seats},
+                "$push": {"released_sweeps": {"$each": [sweep_id], "$slice": -RELEASED_SWEEPS_KEPT}},
+            }
+            if key.get("counter_shard") is None:
+                ticket_types.append(
+                    UpdateOne({"_id": ObjectId(key["ticket_type_id"]), "released_sweeps": {"$ne": sweep_id}}, update)
+                )
+            else:
+                counters.append(
+                    UpdateOne(
+                        {
+                            "ticket_type_id": key["ticket_type_id"],
+                            "shard": key["counter_shard"],
+                            "released_sweeps": {"$ne": sweep_id},
+                        },
+                        update,
+                    )
+                )
+        if ticket_types:
+            await db.ticket_types.bulk_write(ticket_types, ordered=False)
+        if counters:
+            await db.ticket_counters.bulk_write(counters, ordered=False)
+
+
+registration_sweeper = RegistrationSweeper()
@@ -0,0 +1,175 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.database import get_database
+from app.models.ticket import TicketCounter
+
+# A transfer still pending after this long was abandoned (e.g. the process died).
+TRANSFER_RETRY_AFTER = timedelta(minutes=1)
+# Transfer ids remembered on each receiving counter, so a retried credit is not applied twice.
+RECEIVED_TRANSFERS_KEPT = 100
+
+
+def _free_at_least(quantity: int) -> Dict[str, Any]:
+    return {"$expr": {"$gte": [{"$subtract": ["$capacity", {"$add": ["$sold_count", "$reserved"]}]}, quantity]}}
+
+
+class TicketCounterService:
+    """Ticket capacity split across ``ticket_counters`` documents.
+
+    Every reservation on a plain ticket type updates the same ``ticket_types`` document,
+    so a flash sale serializes on that one document. A ticket type created with
+    ``counter_shards = N`` instead gets N counters that each hold a slice of the
+    capacity; a reservation takes seats from a random counter, and only when no single
+    counter has enough left are free seats moved into one.
+
+    Seats are always taken from the donor before they are added, so the shards never
+    sum to more than the capacity. The donor's update also records the transfer in its
+    ``pending_transfers``; the target is then credited (once, keyed by the transfer id)
+    and the record removed. A transfer left pending by a crash is completed by the next
+    rebalance of that ticket type, so the seats are not lost.
+    """
+
+    async def create(self, ticket_type_id: str, capacity: int, shards: int) -> None:
+        db = await get_database()
+        # The first `capacity % shards` counters take one seat of the remainder each.
+        counters = [
+            TicketCounter(
+                ticket_type_id=ticket_type_id,
+                shard=shard,
+                capacity=capacity // shards + int(shard < capacity % shards),
+            )
+            for shard in range(shards)
+        ]
+        await db.ticket_counters.insert_many([c.model_dump(by_alias=True, exclude={"id"}) for c in counters])
+
+    async def totals(self, ticket_type_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """``sold_count`` and ``reserved`` summed over each ticket type's counters."""
+
+        if not ticket_type_ids:
+            return {}
+        db = await get_database()
+        rows = await db.ticket_counters.aggregate(
+            [
+                {"$match": {"ticket_type_id": {"$in": ticket_type_ids}}},
+                {
+                    "$group": {
+                        "_id": "$ticket_type_id",
+                        "sold_count": {"$sum": "$sold_count"},
+                        "reserved": {"$sum": "$reserved"},
+                    }
+                },
+            ]
+        ).to_list(len(ticket_type_ids))
+        return {row["_id"]: {"sold_count": row["sold_count"], "reserved": row["reserved"]} for row in rows}
+
+    async def reserve(self, ticket_type_id: str, shards: int, quantity: int = 1) -> Optional[int]:
+        """Reserve `quantity` seats on one counter and return its shard, or ``None`` if sold out."""
+
+        order = random.sample(range(shards), shards)
+        shard = await self._take(ticket_type_id, order, quantity)
+        # No single counter has enough left: pool free seats into one and try it again.
+        if shard is None and await self._rebalance(ticket_type_id, order[0], quantity):
+            shard = await self._take(ticket_type_id, order[:1], quantity)
+        return shard
+
+    async def _take(self, ticket_type_id: str, shards: List[int], quantity: int) -> Optional[int]:
+        db = await get_database()
+        for shard in shards:
+            result = await db.ticket_counters.update_one(
+                {"ticket_type_id": ticket_type_id, "shard": shard, **_free_at_least(quantity)},
+                {"$inc": {"reserved": quantity}},
+            )
+            if result.modified_count:
+                return shard
+        return None
+
+    async def _rebalance(self, ticket_type_id: str, target: int, quantity: int) -> bool:
+        """Move free seats from the other counters into `target` until it can hold `quantity`."""
+
+        db = await get_database()
+        counters = await db.ticket_counters.find({"ticket_type_id": ticket_type_id}).to_list(None)
+        if await self._finish_transfers(ticket_type_id, counters):
+            counters = await db.ticket_counters.find({"ticket_type_id": ticket_type_id}).to_list(None)
+        free = {c["shard"]: c["capacity"] - c["sold_count"] - c["reserved"] for c in counters}
+        if sum(max(0, seats) for seats in free.values()) < quantity:
+            return False
+
+        needed = quantity - max(0, free.get(target, 0))
+        for shard, seats in sorted(free.items(), key=lambda item: -item[1]):
+            if needed <= 0 or seats <= 0:
+                break
+            if shard == target:
+                continue
+            take = min(seats, needed)
+            transfer = {"id": str(ObjectId()), "to": target, "seats": take, "at": datetime.utcnow()}
+            moved = await db.ticket_counters.update_one(
+                {"ticket_type_id": ticket_type_id, "shard": shard, **_free_at_least(take)},
+                {"$inc": {"capacity": -take}, "$push": {"pending_transfers": transfer}},
+            )
+            if moved.modified_count:
+                await self._credit(ticket_type_id, shard, transfer)
+                needed -= take
+        return needed <= 0
+
+    async def _credit(self, ticket_type_id: str, donor: int, transfer: Dict[str, Any]) -> None:
+        """Add a transfer's seats to its target (at most once) and clear it from the donor."""
+
+        db = await get_database()
+        await db.ticket_counters.update_one(
+            {"ticket_type_id": ticket_type_id, "shard": transfer["to"], "received_transfers": {"$ne": transfer["id"]}},
+            {
+                "$inc": {"capacity": transfer["seats"]},
+                "$push": {"received_transfers": {"$each": [transfer["id"]], "$slice": -RECEIVED_TRANSFERS_KEPT}},
+            },
+        )
+        await db.ticket_counters.update_one(
+            {"ticket_type_id": ticket_type_id, "shard": donor},
+            {"$pull": {"pending_transfers": {"id": transfer["id"]}}},
+        )
+
+    async def _finish_transfers(self, ticket_type_id: str, counters: List[Dict[str, Any]]) -> bool:
+        """Credit transfers an earlier rebalance abandoned; ``True`` if there were any."""
+
+        cutoff = datetime.utcnow() - TRANSFER_RETRY_AFTER
+        abandoned = [
+            (counter["shard"], transfer)
+            for counter in counters
+            for transfer in counter.get("pending_transfers", [])
+            if transfer["at"] < cutoff
+        ]
+        for donor, transfer in abandoned:
+            await self._credit(ticket_type_id, donor, transfer)
+        return bool(abandoned)
+
+    async def release(self, ticket_type_id: str, shard: int, quantity: int = 1) -> None:
+        db = await get_database()
+        await db.ticket_counters.update_one(
+            {"ticket_type_id": ticket_type_id, "shard": shard},
+            {"$inc": {"reserved": -quantity}},
+        )
+
+    async def confirm(self, ticket_type_id: str, shard: int, quantity: int = 1) -> None:
+        """Turn `quantity` reserved seats on `shard` into sold ones."""
+
+        db = await get_database()
+        await db.ticket_counters.update_one(
+            {"ticket_type_id": ticket_type_id, "shard": shard},
+            {"$inc": {"reserved": -quantity, "sold_count": quantity}},
+        )
+
+    async def resize(self, ticket_type_id: str, delta: int) -> None:
+        """Apply a capacity change of `delta` seats to the counter with the most room."""
+
+        db = await get_database()
+        counters = await db.ticket_counters.find({"ticket_type_id": ticket_type_id}).to_list(None)
+        if not counters:
+            return
+        roomiest = max(counters, key=lambda c: c["capacity"] - c["sold_count"] - c["reserved"])
+        await db.ticket_counters.update_one({"_id": roomiest["_id"]}, {"$inc": {"capacity": delta}})
+
+
+ticket_counter_service = TicketCounterService()
@@ -0,0 +1,223 @@
+"""Latency, throughput and memory of the AI features on synthetic events.
+
+Benchmarks:
+
+- ``similarity``: one `similarity()` call between two attendees;
+- ``recommend``: `recommend_connections` for one attendee against the whole event
+  (the stateless POST endpoint, including encoding the profiles);
+- ``profile_index``: `EventProfileIndex.recommend` on a prebuilt index (the per-event
+  endpoint);
+- ``rag``: `RagEngine.answer` with ``top_k=3`` on a prebuilt index of a snapshot.
+
+Each runs at every ``--sizes`` attendee count and reports p50/p99 latency, throughput
+and peak traced memory (setup plus a few operations, under `tracemalloc`). Results are
+written as JSON tagged with the git commit, so runs can be compared::
+
+    python -m benchmarks.ai_suite --sizes 100 1000 10000
+    python -m benchmarks.ai_suite --compare benchmarks/results/ai-<commit>-<time>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import numpy as np
+
+from app.ai.networking import recommend_connections
+from app.ai.profile_index import EventProfileIndex
+from app.ai.rag import RAG_BACKENDS, RagEngine
+from app.ai.similarity import similarity
+from benchmarks.synthetic import synthetic_attendees, synthetic_queries, synthetic_snapshot
+
+BENCHMARKS = ("similarity", "recommend", "profile_index", "rag")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+_MEMORY_OPERATIONS = 5
+
+
+@dataclass
+class Case:
+    setup: Callable[[], Any]
+    run: Callable[[Any, int], Any]
+    operations: int
+
+
+def _similarity_case(size: int, args: argparse.Namespace) -> Case:
+    people = synthetic_attendees(size, args.seed)
+    pairs = np.random.default_rng(args.seed).integers(0, size, (args.queries * 100, 2)).tolist()
+    return Case(lambda: people, lambda people, i: similarity(people[pairs[i][0]], people[pairs[i][1]]), len(pairs))
+
+
+def _recommend_case(size: int, args: argparse.Namespace) -> Case:
+    people = synthetic_attendees(size, args.seed)
+    return Case(
+        lambda: people,
+        lambda people, i: recommend_connections(people[i % size], people, limit=args.limit),
+        args.queries,
+    )
+
+
+def _profile_index_case(size: int, args: argparse.Namespace) -> Case:
+    people = synthetic_attendees(size, args.seed)
+
+    def setup() -> EventProfileIndex:
+        index = EventProfileIndex("benchmark", people)
+        index.matrix
+        return index
+
+    return Case(setup, lambda index, i: index.recommend(people[i % size]["id"], limit=args.limit), args.queries)
+
+
+def _rag_case(size: int, args: argparse.Namespace) -> Case:
+    snapshot = synthetic_snapshot(size, seed=args.seed)
+    queries = synthetic_queries(snapshot, args.queries, args.seed)
+
+    def setup():
+        engine = RagEngine(backend=args.rag_backend)
+        engine.start_loading()
+        while engine.model_state == "loading":
+            time.sleep(0.05)
+        return engine, engine.build_index(engine.build_documents(snapshot))
+
+    return Case(setup, lambda state, i: state[0].answer(queries[i], state[1], top_k=3), len(queries))
+
+
+CASES = {
+    "similarity": _similarity_case,
+    "recommend": _recommend_case,
+    "profile_index": _profile_index_case,
+    "rag": _rag_case,
+}
+
+
+def measure(case: Case, budget: float) -> dict:
+    started = time.perf_counter()
+    state = case.setup()
+    setup_seconds = time.perf_counter() - started
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(case.operations):
+        op_started = time.perf_counter()
+        case.run(state, i)
+        latencies.append(time.perf_counter() - op_started)
+        if i >= 2 and time.perf_counter() - started > budget:
+            break
+    elapsed = time.perf_counter() - started
+    del state
+
+    tracemalloc.start()
+    try:
+        state = case.setup()
+        for i in range(min(case.operations, _MEMORY_OPERATIONS)):
+            case.run(state, i)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "setup_seconds": round(setup_seconds, 4),
+        "operations": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+
+
+def git_commit() -> dict:
+    def git(*command: str) -> str:
+        return subprocess.run(["git", *command], capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+
+
+def run(args: argparse.Namespace) -> dict:
+    results = []
+    for name in args.benchmarks:
+        for size in args.sizes:
+            result = {"benchmark": name, "size": size, **measure(CASES[name](size, args), args.budget)}
+            results.append(result)
+            if not args.json:
+                _print_row(result)
+    return {
+        "meta": {
+            **git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "seed": args.seed,
+            "queries": args.queries,
+            "limit": args.limit,
+            "rag_backend": args.rag_backend,
+        },
+        "results": results,
+    }
+
+
+def _print_row(result: dict, baseline: dict | None = None) -> None:
+    line = (
+        f"{result['benchmark']:>13} {result['size']:>7} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+        f"{result['throughput_per_s']:>10.1f} {result['peak_memory_mb']:>9.1f} {result['setup_seconds']:>8.2f}"
+    )
+    if baseline:
+        line += f"  p50 x{result['p50_ms'] / max(baseline['p50_ms'], 1e-9):.2f} vs baseline"
+    print(line)
+
+
+def compare(current: dict, baseline: dict) -> None:
+    previous = {(row["benchmark"], row["size"]): row for row in baseline["results"]}
+    print(f"baseline {baseline['meta']['commit'][:10]} -> current {current['meta']['commit'][:10]}")
+    for row in current["results"]:
+        _print_row(row, previous.get((row["benchmark"], row["size"])))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark networking and RAG on synthetic events")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=20, help="operations per benchmark and size")
+    parser.add_argument("--limit", type=int, default=3, help="matches per recommendation")
+    parser.add_argument("--rag-backend", choices=RAG_BACKENDS, default="bm25")
+    parser.add_argument("--budget", type=float, default=30.0, help="max seconds of operations per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/ai-<commit>-<time>.json)")
+    parser.add_argument("--compare", metavar="RESULTS", help="earlier results file to compare against")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'benchmark':>13} {'size':>7} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak MB':>9} {'setup s':>8}")
+    result = run(args)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"ai-{result['meta']['commit'][:10]}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(result, handle, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"results written to {output}")
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(result, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Recall vs. latency of the IVF index against the exact matrix scan.
+
+Builds an index over synthetic clustered embeddings (shaped like all-MiniLM-L6-v2
+output), saves and reloads it memory-mapped, then sweeps `nprobe`::
+
+    python -m benchmarks.ann_recall --documents 100000 --queries 200
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from app.ai.ann import IVFIndex
+from benchmarks.synthetic import synthetic_embeddings
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def run(args: argparse.Namespace) -> dict:
+    vectors = synthetic_embeddings(args.documents, args.dim, args.topics, args.seed)
+    queries = synthetic_embeddings(args.queries, args.dim, args.topics, args.seed + 1)
+
+    started = time.perf_counter()
+    built = IVFIndex.build(vectors, args.lists)
+    build_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as path:
+        built.save(path)
+        index = IVFIndex.load(path, mmap=True)
+
+        started = time.perf_counter()
+        truth = [exact_top_k(vectors, q, args.k) for q in queries]
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        rows = []
+        for nprobe in args.nprobe:
+            latencies = []
+            hits = 0
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                ids, _ = index.search(query, args.k, nprobe=nprobe)
+                latencies.append((time.perf_counter() - started) * 1000)
+                hits += len(set(ids.tolist()) & set(expected.tolist()))
+            rows.append(
+                {
+                    "nprobe": nprobe,
+                    "recall": hits / (args.k * len(queries)),
+                    "p50_ms": float(np.percentile(latencies, 50)),
+                    "p99_ms": float(np.percentile(latencies, 99)),
+                }
+            )
+
+    return {
+        "documents": args.documents,
+        "dim": args.dim,
+        "lists": built.n_lists,
+        "k": args.k,
+        "build_seconds": build_seconds,
+        "exact_ms": exact_ms,
+        "ivf": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="IVF recall vs. latency against the exact scan")
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default: sqrt(documents))")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(
+        f"{result['documents']} docs x {result['dim']}d, {result['lists']} lists, "
+        f"built in {result['build_seconds']:.2f}s; exact scan {result['exact_ms']:.2f} ms/query"
+    )
+    print(f"{'nprobe':>6} {'recall@' + str(result['k']):>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for row in result["ivf"]:
+        print(f"{row['nprobe']:>6} {row['recall']:>10.3f} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Concurrent registrations for one ticket type: throughput and oversell.
+
+Fires ``--registrations`` `RegistrationService.create_registration` calls at one
+ticket type of ``--capacity`` seats, at most ``--concurrency`` at a time, and then
+compares ``sold_count + reserved`` with the capacity. ``--mode check-then-inc`` runs
+the previous flow (availability read, then a separate ``$inc``) for comparison.
+
+``--shards N`` gives the ticket type N counter documents instead of the single
+``ticket_types`` counter, and ``--operation reserve`` calls only
+`InventoryService.reserve`, which isolates the counter contention from pricing, QR
+codes and inserts.
+
+Calls that raise are counted as ``errors`` by exception type; the first traceback of
+each type goes to stderr and the run exits with status 1, since the figures then do
+not measure the reservation flow.
+
+Needs MongoDB at ``MONGODB_URL``; everything goes to ``--database``, which is dropped
+afterwards unless ``--keep`` is given::
+
+    python -m benchmarks.registration_load --registrations 1000 --capacity 500
+    python -m benchmarks.registration_load --mode check-then-inc
+    python -m benchmarks.registration_load --operation reserve --shards 16
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.database import db as database, get_database
+from app.models.ticket import TicketType
+from app.services.inventory_service import inventory_service
+from app.services.metadata_cache import RequestLoader
+from app.services.pricing_service import pricing_service
+from app.services.registration_service import registration_service
+from app.services.ticket_counter_service import ticket_counter_service
+
+MODES = ("atomic", "check-then-inc")
+OPERATIONS = ("register", "reserve")
+
+
+async def check_then_inc(
+    ticket_type_id: str,
+    quantity: int = 1,
+    loader: Optional[RequestLoader] = None,
+) -> Dict[str, Any]:
+    """The reservation flow before `InventoryService`: read, check, then increment.
+
+    Takes the same arguments as `InventoryService.reserve`, which it replaces.
+    """
+
+    availability = await pricing_service.check_availability(ticket_type_id, quantity, loader)
+    if availability["available"]:
+        db = await get_database()
+        await db.ticket_types.update_one({"_id": ObjectId(ticket_type_id)}, {"$inc": {"reserved": quantity}})
+        availability["ticket"] = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+        if loader is not None:
+            loader.seed("ticket_types", availability["ticket"])
+    return availability
+
+
+async def seed(args: argparse.Namespace) -> tuple[str, str]:
+    db = await get_database()
+    event = await db.events.insert_one(
+        {"name": "Registration load test", "slug": f"load-test-{ObjectId()}", "start_date": datetime.utcnow()}
+    )
+    event_id = str(event.inserted_id)
+    ticket = TicketType(
+        event_id=event_id,
+        name="General admission",
+        base_price=25.0,
+        capacity=args.capacity,
+        counter_shards=args.shards if args.shards > 1 else 0,
+    )
+    result = await db.ticket_types.insert_one(ticket.model_dump(by_alias=True, exclude={"id"}))
+    ticket_type_id = str(result.inserted_id)
+    if ticket.counter_shards:
+        await ticket_counter_service.create(ticket_type_id, args.capacity, ticket.counter_shards)
+    return event_id, ticket_type_id
+
+
+async def hammer(args: argparse.Namespace, event_id: str, ticket_type_id: str) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    outcomes = {"accepted": 0, "rejected": 0, "errors": 0}
+    errors: Counter = Counter()
+
+    async def register(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if args.operation == "reserve":
+                    accepted = (await inventory_service.reserve(ticket_type_id))["available"]
+                else:
+                    result = await registration_service.create_registration(
+                        {
+                            "event_id": event_id,
+                            "ticket_type_id": ticket_type_id,
+                            "first_name": "Load",
+                            "last_name": f"Tester {i}",
+                            "email": f"load-{i}@example.com",
+                            "group_size": 1,
+                        }
+                    )
+                    accepted = result["success"]
+                outcomes["accepted" if accepted else "rejected"] += 1
+            except Exception as exc:
+                outcomes["errors"] += 1
+                kind = type(exc).__name__
+                if not errors[kind]:
+                    traceback.print_exc(file=sys.stderr)
+                errors[kind] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(register(i) for i in range(args.registrations)))
+    elapsed = time.perf_counter() - started
+
+    db = await get_database()
+    ticket = await db.ticket_types.find_one({"_id": ObjectId(ticket_type_id)})
+    ticket.update((await ticket_counter_service.totals([ticket_type_id])).get(ticket_type_id, {}))
+    taken = ticket.get("sold_count", 0) + ticket.get("reserved", 0)
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "mode": args.mode,
+        "operation": args.operation,
+        "shards": args.shards,
+        "registrations": args.registrations,
+        "concurrency": args.concurrency,
+        "capacity": args.capacity,
+        **outcomes,
+        "error_types": dict(errors),
+        "registration_documents": await db.registrations.count_documents({"event_id": event_id}),
+        "taken": taken,
+        "oversold": max(0, taken - args.capacity),
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(args.registrations / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    settings.database_name = args.database
+    database.client = AsyncIOMotorClient(settings.mongodb_url, maxPoolSize=args.pool_size)
+    if args.mode == "check-then-inc":
+        inventory_service.reserve = check_then_inc
+    try:
+        event_id, ticket_type_id = await seed(args)
+        return await hammer(args, event_id, ticket_type_id)
+    finally:
+        if not args.keep:
+            await database.client.drop_database(args.database)
+        database.client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test concurrent registrations for one ticket type")
+    parser.add_argument("--mode", choices=MODES, default="atomic")
+    parser.add_argument("--operation", choices=OPERATIONS, default="register")
+    parser.add_argument("--shards", type=int, default=0, help="counter documents for the ticket type (0: single)")
+    parser.add_argument("--registrations", type=int, default=1_000)
+    parser.add_argument("--capacity", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1_000, help="registrations in flight at once")
+    parser.add_argument("--pool-size", type=int, default=100, help="MongoDB connection pool size")
+    parser.add_argument("--database", default="event_platform_load_test")
+    parser.add_argument("--keep", action="store_true", help="keep the load-test database")
+    args = parser.parse_args()
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if result["errors"]:
+        print(f"{result['errors']} calls raised {result['error_types']}; see the tracebacks above", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
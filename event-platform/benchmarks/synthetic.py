@@ -0,0 +1,122 @@
+"""Seeded synthetic data for the benchmarks.
+
+Attendee tags follow a Zipf-like distribution (a few popular interests, a long tail),
+roles come from `ROLE_GROUPS` plus some unknown titles, and cities from
+`CITY_TO_REGION` plus some the region table does not know. Snapshots have the shape
+returned by `RagService.build_snapshot`.
+"""
+
+import numpy as np
+
+from app.ai.similarity import CITY_TO_REGION, ROLE_GROUPS
+
+INDUSTRIES = ["fintech", "healthtech", "edtech", "e-commerce", "logistics", "energy", "media", "saas"]
+OTHER_ROLES = ["Designer", "Sales Lead", "Student", "Marketing Manager"]
+OTHER_CITIES = ["Berlin", "Singapore", "Nairobi", "Austin"]
+ROOMS = ["Hall A", "Hall B", "B12", "C3", "Auditorium", "Workshop 1", "Workshop 2"]
+
+_TAG_VOCAB = {"interests": 400, "skills": 300, "goals": 60}
+_TAG_COUNTS = {"interests": (2, 8), "skills": (1, 6), "goals": (1, 3)}
+
+
+def _zipf_weights(size: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _pick(rng: np.random.Generator, values: list, missing: float):
+    return None if rng.random() < missing else values[rng.integers(len(values))]
+
+
+def synthetic_attendees(count: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    roles = sorted(role for members in ROLE_GROUPS.values() for role in members) + OTHER_ROLES
+    cities = [city.title() for city in CITY_TO_REGION] + OTHER_CITIES
+    companies = [f"Company {i}" for i in range(max(10, count // 20))]
+    weights = {field: _zipf_weights(size) for field, size in _TAG_VOCAB.items()}
+
+    attendees = []
+    for i in range(count):
+        profile = {
+            "id": f"a{i}",
+            "name": f"Attendee {i}",
+            "company": _pick(rng, companies, 0.1),
+            "industry": _pick(rng, INDUSTRIES, 0.15),
+            "role": _pick(rng, roles, 0.1),
+            "location": _pick(rng, cities, 0.2),
+        }
+        for field, (low, high) in _TAG_COUNTS.items():
+            size = int(rng.integers(low, high + 1))
+            tags = rng.choice(_TAG_VOCAB[field], size=size, replace=False, p=weights[field])
+            profile[field] = [f"{field[:-1]} {tag}" for tag in tags.tolist()]
+        attendees.append(profile)
+    return attendees
+
+
+def synthetic_snapshot(attendees: int, events: int = 20, sessions: int = 200, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed + 1)
+    cities = [city.title() for city in CITY_TO_REGION] + OTHER_CITIES
+    people = synthetic_attendees(attendees, seed)
+    return {
+        "events": [
+            {
+                "id": f"e{i}",
+                "name": f"{INDUSTRIES[i % len(INDUSTRIES)].title()} Summit {i}",
+                "description": f"Annual {INDUSTRIES[i % len(INDUSTRIES)]} conference",
+                "startDate": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T09:00:00",
+                "location": cities[rng.integers(len(cities))],
+            }
+            for i in range(events)
+        ],
+        "sessions": [
+            {
+                "id": f"s{i}",
+                "title": f"Talk {i} on {people[rng.integers(len(people))]['interests'][0]}" if people else f"Talk {i}",
+                "speaker": f"Speaker {i}",
+                "startTime": f"{9 + i % 8}:00",
+                "endTime": f"{10 + i % 8}:00",
+                "room": ROOMS[i % len(ROOMS)],
+                "tags": [INDUSTRIES[i % len(INDUSTRIES)]],
+            }
+            for i in range(sessions)
+        ],
+        "attendees": [
+            {key: person[key] for key in ("id", "name", "company", "industry", "role", "interests")}
+            for person in people
+        ],
+        "faq": [
+            {"question": "Where can I find the wifi password?", "answer": "It is printed on your badge."},
+            {"question": "When does registration open?", "answer": "At 8:00 in the main lobby."},
+            {"question": "Is lunch provided?", "answer": "Yes, in Hall A from 12:30."},
+        ],
+    }
+
+
+def synthetic_queries(snapshot: dict, count: int, seed: int = 0) -> list[str]:
+    """Chat questions mixing exact keywords (rooms, names) with vaguer topical ones."""
+
+    rng = np.random.default_rng(seed + 2)
+    templates = [
+        lambda: f"where is room {ROOMS[rng.integers(len(ROOMS))]}",
+        lambda: f"who works on {_any(rng, snapshot['attendees'], 'interests')}",
+        lambda: f"which talks cover {_any(rng, snapshot['attendees'], 'interests')}",
+        lambda: "what is the wifi password",
+        lambda: f"when is the {INDUSTRIES[rng.integers(len(INDUSTRIES))]} summit",
+    ]
+    return [templates[rng.integers(len(templates))]() for _ in range(count)]
+
+
+def _any(rng: np.random.Generator, people: list[dict], field: str) -> str:
+    if not people:
+        return "networking"
+    tags = people[rng.integers(len(people))].get(field) or ["networking"]
+    return tags[rng.integers(len(tags))]
+
+
+def synthetic_embeddings(count: int, dim: int, topics: int, seed: int, noise: float = 0.6) -> np.ndarray:
+    """L2-normalized vectors clustered around `topics` random centres."""
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, topics, count)] + noise * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
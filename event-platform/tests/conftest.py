@@ -0,0 +1,165 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Settings are read from the environment on import; the example values are enough here.
+for line in (ROOT / ".env.example").read_text().splitlines():
+    key, sep, value = line.partition("=")
+    if sep and not key.lstrip().startswith("#"):
+        os.environ.setdefault(key.strip(), value.strip())
+
+import app.services.registration_service  # noqa: E402,F401
+
+# The package re-exports the singleton under the module's name.
+registration_module = sys.modules["app.services.registration_service"]
+
+
+def _matches(document, query):
+    for key, condition in query.items():
+        value = document.get(key)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return [dict(document) for document in self.documents]
+
+
+class FakeCollection:
+    """The slice of a Motor collection `RegistrationService.confirm_payment` uses."""
+
+    def __init__(self, documents=()):
+        self.documents = [dict(document) for document in documents]
+        # Called after a filter matched and before the update is applied (to stage races).
+        self.before_update = None
+
+    async def find_one(self, query, projection=None):
+        for document in self.documents:
+            if _matches(document, query):
+                return dict(document)
+        return None
+
+    def find(self, query, projection=None):
+        return _Cursor([document for document in self.documents if _matches(document, query)])
+
+    async def update_one(self, query, update):
+        return _Result(self._update(query, update, many=False))
+
+    async def update_many(self, query, update):
+        return _Result(self._update(query, update, many=True))
+
+    def _update(self, query, update, many):
+        if self.before_update is not None:
+            self.before_update(query)
+        modified = 0
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(update.get("$set", {}))
+                modified += 1
+                if not many:
+                    break
+        return modified
+
+
+class FakeDatabase:
+    def __init__(self, registrations=()):
+        self.registrations = FakeCollection(registrations)
+        self.ticket_types = FakeCollection()
+
+
+class FakeInventory:
+    def __init__(self, available=True):
+        self.available = available
+        self.reserved, self.released, self.confirmed = [], [], []
+
+    async def reserve(self, ticket_type_id, quantity=1, loader=None):
+        if not self.available:
+            return {"available": False, "reason": "Not enough tickets available"}
+        self.reserved.append(quantity)
+        return {"available": True, "ticket": {"name": "General"}}
+
+    async def release(self, ticket_type_id, quantity=1, counter_shard=None):
+        self.released.append(quantity)
+
+    async def confirm(self, ticket_type_id, quantity=1, counter_shard=None):
+        self.confirmed.append(quantity)
+
+
+class FakeLoader:
+    async def ticket_type(self, ticket_type_id, counters=False):
+        return {"name": "General"}
+
+    async def event(self, event_id):
+        return {"name": "Summit", "location": "Riyadh"}
+
+
+def make_registration(**fields):
+    registration = {
+        "_id": ObjectId(),
+        "event_id": "event-1",
+        "ticket_type_id": str(ObjectId()),
+        "status": "pending",
+        "first_name": "Ada",
+        "last_name": "Lovelace",
+        "email": "ada@example.com",
+        "group_size": 1,
+        "is_group_lead": False,
+        "group_id": None,
+        "counter_shard": None,
+        "final_price": 25.0,
+        "discount_amount": 0.0,
+        "qr_code": "QR",
+        "qr_code_image": "image",
+    }
+    registration.update(fields)
+    return registration
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """Patch the registration service's collaborators; returns a function that installs a database."""
+
+    inventory = FakeInventory()
+    emails = []
+
+    async def send_confirmation_email(to_email, data, image):
+        emails.append(to_email)
+        return True
+
+    async def add_registration(registration):
+        pass
+
+    monkeypatch.setattr(registration_module, "inventory_service", inventory)
+    monkeypatch.setattr(registration_module, "RequestLoader", FakeLoader)
+    monkeypatch.setattr(registration_module.email_service, "send_confirmation_email", send_confirmation_email)
+    monkeypatch.setattr(registration_module.networking_service, "add_registration", add_registration)
+
+    def install(*registrations):
+        database = FakeDatabase(registrations)
+
+        async def get_database():
+            return database
+
+        monkeypatch.setattr(registration_module, "get_database", get_database)
+        return database
+
+    return registration_module.registration_service, inventory, emails, install
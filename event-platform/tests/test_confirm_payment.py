@@ -0,0 +1,88 @@
+import asyncio
+
+from app.models.registration import PaymentConfirmation, PaymentStatus, RegistrationStatus
+
+from conftest import make_registration
+
+PAYMENT = {"payment_method": "stripe", "payment_intent_id": "pi_1", "transaction_id": "ch_1"}
+
+
+def test_pending_registration_is_confirmed(services):
+    service, inventory, emails, install = services
+    registration = make_registration()
+    db = install(registration)
+
+    outcome = asyncio.run(service.confirm_payment(str(registration["_id"]), PAYMENT))
+
+    assert outcome is PaymentConfirmation.CONFIRMED
+    assert db.registrations.documents[0]["status"] == RegistrationStatus.CONFIRMED
+    assert inventory.reserved == []
+    assert inventory.confirmed == [1]
+    assert emails == ["ada@example.com"]
+
+
+def test_payment_after_expiry_reserves_again(services):
+    service, inventory, emails, install = services
+    lead = make_registration(status="expired", is_group_lead=True, group_id="g1")
+    member = make_registration(status="expired", group_id="g1", email="bob@example.com")
+    db = install(lead, member)
+
+    outcome = asyncio.run(service.confirm_payment(str(lead["_id"]), PAYMENT))
+
+    assert outcome is PaymentConfirmation.CONFIRMED
+    assert [doc["status"] for doc in db.registrations.documents] == [RegistrationStatus.CONFIRMED] * 2
+    assert db.registrations.documents[1]["paid_by_registration_id"] == str(lead["_id"])
+    assert inventory.reserved == [2]
+    assert inventory.confirmed == [2]
+    assert inventory.released == []
+    assert sorted(emails) == ["ada@example.com", "bob@example.com"]
+
+
+def test_payment_after_expiry_when_sold_out_is_flagged_for_refund(services):
+    service, inventory, emails, install = services
+    inventory.available = False
+    registration = make_registration(status="expired")
+    db = install(registration)
+
+    outcome = asyncio.run(service.confirm_payment(str(registration["_id"]), PAYMENT))
+
+    stored = db.registrations.documents[0]
+    assert outcome is PaymentConfirmation.SOLD_OUT
+    assert stored["status"] == "expired"
+    assert stored["refund_required"] is True
+    assert stored["payment_status"] == PaymentStatus.COMPLETED
+    assert stored["payment_intent_id"] == "pi_1"
+    assert inventory.confirmed == []
+    assert emails == []
+
+
+def test_expired_registration_claimed_concurrently_releases_seats(services):
+    service, inventory, emails, install = services
+    registration = make_registration(status="expired")
+    db = install(registration)
+
+    def confirm_elsewhere(query):
+        # A redelivered webhook confirms the registration between the reserve and the claim.
+        if query.get("status") == RegistrationStatus.EXPIRED:
+            db.registrations.documents[0]["status"] = RegistrationStatus.CONFIRMED
+
+    db.registrations.before_update = confirm_elsewhere
+
+    outcome = asyncio.run(service.confirm_payment(str(registration["_id"]), PAYMENT))
+
+    assert outcome is PaymentConfirmation.NOT_PENDING
+    assert inventory.reserved == [1]
+    assert inventory.released == [1]
+    assert inventory.confirmed == []
+    assert emails == []
+
+
+def test_cancelled_registration_is_left_alone(services):
+    service, inventory, emails, install = services
+    registration = make_registration(status="cancelled")
+    install(registration)
+
+    outcome = asyncio.run(service.confirm_payment(str(registration["_id"]), PAYMENT))
+
+    assert outcome is PaymentConfirmation.NOT_PENDING
+    assert inventory.reserved == inventory.confirmed == []
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import pytest
+
+from conftest import registration_module
+
+_split_evenly = registration_module._split_evenly
+
+
+def _cents(shares):
+    return sum(Decimal(str(share)) * 100 for share in shares)
+
+
+@pytest.mark.parametrize(
+    "amount, parts, expected",
+    [
+        (100.0, 4, [25.0, 25.0, 25.0, 25.0]),
+        (100.0, 3, [33.34, 33.33, 33.33]),
+        (0.1, 3, [0.04, 0.03, 0.03]),
+        (0.02, 5, [0.01, 0.01, 0.0, 0.0, 0.0]),
+        (0.0, 3, [0.0, 0.0, 0.0]),
+    ],
+)
+def test_shares_are_whole_cents_adding_up_to_the_amount(amount, parts, expected):
+    shares = _split_evenly(amount, parts)
+
+    assert shares == expected
+    assert _cents(shares) == round(amount * 100)
+
+
+def test_total_smaller_than_member_count_has_no_negative_share():
+    # Ten cents across twelve members: rounding each share up to a cent overshoots the total.
+    shares = _split_evenly(0.1, 12)
+
+    assert shares == [0.01] * 10 + [0.0] * 2
+    assert _cents(shares) == 10